@@ -0,0 +1,77 @@
+# benchmarks/bench_jwt.py
+"""
+Authenticated requests/sec with and without the verified-claims cache.
+
+Uses a throw-away SQLite DB and stateless auth (claims-only), so the numbers
+isolate token handling: GET /users/me with one reused token, first clearing
+the JWT cache before every request ("before"), then keeping it ("after").
+
+Run:
+    python -m benchmarks.bench_jwt [seconds]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("EVENTHUB_DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+os.environ["EVENTHUB_AUTH_STATELESS"] = "1"
+os.environ["FORCE_SQL_USERS"] = "0"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from server.core import jwt as jwt_mod  # noqa: E402
+from server.infra.db import engine  # noqa: E402
+from server.models.db_models import Base  # noqa: E402
+
+Base.metadata.create_all(engine)
+
+from server.main import app  # noqa: E402
+
+
+def _rps(client: TestClient, headers: dict, seconds: float, cached: bool) -> float:
+    n = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        if not cached:
+            jwt_mod._claims_cache.clear()
+        r = client.get("/users/me", headers=headers)
+        assert r.status_code == 200, r.text
+        n += 1
+    return n / (time.perf_counter() - start)
+
+
+def _decodes_per_sec(token: str, seconds: float, cached: bool) -> float:
+    n = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        if cached:
+            jwt_mod.decode_access_token(token)
+        else:
+            jwt_mod._verify(token)
+        n += 1
+    return n / (time.perf_counter() - start)
+
+
+def main() -> None:
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    token = jwt_mod.create_access_token(
+        sub="bench@example.com", role="USER",
+        extra={"uid": 1, "name": "bench", "active": True, "tv": 0},
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    client = TestClient(app)
+
+    d_before = _decodes_per_sec(token, seconds, cached=False)
+    d_after = _decodes_per_sec(token, seconds, cached=True)
+    before = _rps(client, headers, seconds, cached=False)
+    after = _rps(client, headers, seconds, cached=True)
+    print(f"decode_access_token : {d_before:10,.0f} → {d_after:10,.0f} /sec  (x{d_after / d_before:.1f})")
+    print(f"GET /users/me       : {before:10,.0f} → {after:10,.0f} req/sec (x{after / before:.2f})")
+
+
+if __name__ == "__main__":
+    main()
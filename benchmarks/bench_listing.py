@@ -0,0 +1,92 @@
+# benchmarks/bench_listing.py
+"""
+Listing throughput: full ORM entities vs. column projection.
+
+Seeds a throw-away SQLite DB with events that carry a realistic
+description (the NVARCHAR(MAX) column on SQL Server) and times the
+/events/search page query both ways.
+
+Run:
+    python -m benchmarks.bench_listing [n_events] [page_size]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from server.models.db_models import Base, EventDB
+
+_COLUMNS = (
+    EventDB.Id, EventDB.Title, EventDB.City, EventDB.Venue,
+    EventDB.starts_at, EventDB.Price, EventDB.image_url, EventDB.CreatedAt,
+)
+
+
+def _seed(Session, n: int) -> None:
+    base = datetime(2025, 1, 1)
+    desc = "Lorem ipsum dolor sit amet. " * 80  # ~2KB
+    with Session() as db:
+        db.add_all(
+            EventDB(
+                Title=f"Event {i}", City="Tel Aviv", Venue="Hall", Category="Music",
+                Url=f"https://example.com/e/{i}", description=desc, Price=100,
+                CreatedAt=base + timedelta(minutes=i), starts_at=base + timedelta(days=i % 90),
+                status="PUBLISHED",
+            )
+            for i in range(n)
+        )
+        db.commit()
+
+
+def _orm_page(db, limit: int) -> list[dict]:
+    stmt = select(EventDB).order_by(EventDB.CreatedAt.desc(), EventDB.Id.desc()).limit(limit)
+    return [
+        {"id": e.Id, "title": e.Title, "city": e.City, "venue": e.Venue,
+         "starts_at": e.starts_at, "price": e.Price, "image_url": e.image_url}
+        for e in db.execute(stmt).scalars().all()
+    ]
+
+
+def _projected_page(db, limit: int) -> list[dict]:
+    stmt = select(*_COLUMNS).order_by(EventDB.CreatedAt.desc(), EventDB.Id.desc()).limit(limit)
+    return [
+        {"id": r.Id, "title": r.Title, "city": r.City, "venue": r.Venue,
+         "starts_at": r.starts_at, "price": r.Price, "image_url": r.image_url}
+        for r in db.execute(stmt).all()
+    ]
+
+
+def _rows_per_sec(Session, fn, limit: int, seconds: float = 2.0) -> float:
+    rows = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        with Session() as db:  # fresh session per request, like get_db()
+            rows += len(fn(db, limit))
+    return rows / (time.perf_counter() - start)
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    _seed(Session, n)
+
+    before = _rows_per_sec(Session, _orm_page, limit)
+    after = _rows_per_sec(Session, _projected_page, limit)
+    print(f"events={n} page={limit}")
+    print(f"ORM entities : {before:12,.0f} rows/sec")
+    print(f"projection   : {after:12,.0f} rows/sec  (x{after / before:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# benchmarks/bench_password.py
+"""
+Login throughput vs. search latency under a bcrypt storm.
+
+For each mode a child process (so EVENTHUB_PASSWORD_WORKERS applies at import)
+fires `logins` concurrent bcrypt verifies for a few seconds while a search
+loop runs the /events/search page query through Starlette's threadpool,
+exactly like a sync endpoint.
+
+Modes:
+- inline   – verify_password on the shared threadpool (old sync /auth/login)
+- pool:N   – verify_password_async on the dedicated executor with N workers
+
+Run:
+    python -m benchmarks.bench_password [logins] [seconds]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def _make_search(path: str):
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import sessionmaker
+    from server.models.db_models import Base, EventDB
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    base = datetime(2025, 1, 1)
+    with Session() as db:
+        db.add_all(
+            EventDB(Title=f"Event {i}", City="Haifa", CreatedAt=base + timedelta(minutes=i), status="PUBLISHED")
+            for i in range(2000)
+        )
+        db.commit()
+    stmt = select(EventDB.Id, EventDB.Title, EventDB.City).order_by(EventDB.CreatedAt.desc()).limit(20)
+
+    def search() -> int:
+        with Session() as db:
+            return len(db.execute(stmt).all())
+
+    return search
+
+
+async def _child(mode: str, logins: int, seconds: float) -> None:
+    from starlette.concurrency import run_in_threadpool
+    from server.core import security
+
+    search = _make_search(os.path.join(tempfile.mkdtemp(), "bench.db"))
+    hashed = security.hash_password("correct horse")
+    stop = time.perf_counter() + seconds
+    done = 0
+    rejected = 0
+
+    async def login_loop() -> None:
+        nonlocal done, rejected
+        while time.perf_counter() < stop:
+            try:
+                if mode == "inline":
+                    await run_in_threadpool(security.verify_password, "correct horse", hashed)
+                else:
+                    await security.verify_password_async("correct horse", hashed)
+                done += 1
+            except security.PasswordBusyError:
+                rejected += 1
+                await asyncio.sleep(0.01)
+
+    latencies: list[float] = []
+
+    async def search_loop() -> None:
+        while time.perf_counter() < stop:
+            t0 = time.perf_counter()
+            await run_in_threadpool(search)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            await asyncio.sleep(0.005)
+
+    await asyncio.gather(search_loop(), *(login_loop() for _ in range(logins)))
+    q = statistics.quantiles(latencies, n=20)
+    print(
+        f"{mode:8} logins/sec={done / seconds:8.1f}  rejected={rejected:5d}  "
+        f"search p50={statistics.median(latencies):6.2f}ms p95={q[18]:7.2f}ms"
+    )
+
+
+def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        asyncio.run(_child(sys.argv[2], int(sys.argv[3]), float(sys.argv[4])))
+        return
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    seconds = sys.argv[2] if len(sys.argv) > 2 else "3"
+    cores = os.cpu_count() or 2
+    workers = sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+    print(f"cores={cores} concurrent logins={logins}")
+    runs = [("inline", None)] + [(f"pool:{n}", n) for n in workers]
+    for mode, n in runs:
+        env = dict(os.environ)
+        if n:
+            env["EVENTHUB_PASSWORD_WORKERS"] = str(n)
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_password", "--child",
+             "inline" if n is None else "pool", str(logins), seconds],
+            env=env, check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,71 @@
 # client/services/events_service.py
 import os, requests
+from threading import Lock
 BASE = os.getenv("GATEWAY_BASE_URL", "http://127.0.0.1:9000")
 
+# url+params -> (etag, data); shared by all EventsService instances
+_ETAG_CACHE: dict = {}
+_ETAG_LOCK = Lock()
+_ETAG_MAX = 256
+
+def _get_cached(path: str, params: dict | None = None, timeout: int = 10):
+    """GET with If-None-Match; a 304 costs only headers and reuses the local copy."""
+    key = (path, tuple(sorted((k, str(v)) for k, v in (params or {}).items() if v is not None)))
+    with _ETAG_LOCK:
+        hit = _ETAG_CACHE.get(key)
+    headers = {"If-None-Match": hit[0]} if hit else {}
+    r = requests.get(f"{BASE}{path}", params=params, headers=headers, timeout=timeout)
+    if r.status_code == 304 and hit:
+        return hit[1]
+    r.raise_for_status()
+    data = r.json()
+    etag = r.headers.get("ETag")
+    if etag:
+        with _ETAG_LOCK:
+            if len(_ETAG_CACHE) >= _ETAG_MAX:
+                _ETAG_CACHE.pop(next(iter(_ETAG_CACHE)))
+            _ETAG_CACHE[key] = (etag, data)
+    return data
+
 class EventsService:
     def search(self, q: str = "", **params) -> list:
-        p = {"q": q or None, "page": 1, "limit": 12, **params}
-        r = requests.get(f"{BASE}/events/search", params=p, timeout=10)
+        p = {"q": q or None, "page": 1, "limit": 12, "count": "estimated", **params}
+        return (_get_cached("/events/search", p) or {}).get("items", [])
+
+    def get_events(self, event_ids) -> dict:
+        """{"items": [...], "missing": [...]} – one round trip for many ids."""
+        ids = ",".join(str(int(i)) for i in event_ids)
+        if not ids:
+            return {"items": [], "missing": []}
+        r = requests.get(f"{BASE}/events", params={"ids": ids}, timeout=10)
         r.raise_for_status()
-        return (r.json() or {}).get("items", [])
+        return r.json() or {}
 
-    def get_event(self, event_id: int) -> dict:
-        r = requests.get(f"{BASE}/events/{event_id}", timeout=10)
+    def facets(self) -> dict:
+        r = requests.get(f"{BASE}/events/facets", timeout=10)
         r.raise_for_status()
         return r.json() or {}
 
+    def get_event(self, event_id: int) -> dict:
+        return _get_cached(f"/events/{int(event_id)}") or {}
+
+    def reaction_state(self, event_ids) -> dict:
+        """{"liked": [...], "saved": [...]} for a page of events – one small query on the server."""
+        ids = ",".join(str(int(i)) for i in event_ids)
+        if not ids:
+            return {"liked": [], "saved": []}
+        r = requests.get(f"{BASE}/reactions/me/state", params={"event_ids": ids}, timeout=8)
+        if r.status_code != 200:
+            return {"liked": [], "saved": []}
+        return r.json() or {}
+
     def is_liked(self, event_id: int) -> bool:
-        r = requests.get(f"{BASE}/reactions/me", params={"type": "LIKE", "event_id": event_id}, timeout=8)
-        if r.status_code == 200:
-            js = r.json()
-            if isinstance(js, dict) and "liked" in js: return bool(js["liked"])
-            if isinstance(js, list): return any(str(x.get("event_id")) == str(event_id) for x in js)
-        return False
+        return int(event_id) in (self.reaction_state([event_id]).get("liked") or [])
 
     def like(self, event_id: int) -> None:
         r = requests.post(f"{BASE}/reactions", json={"event_id": event_id, "type": "LIKE"}, timeout=10)
         if r.status_code not in (200, 201, 204, 409): r.raise_for_status()
 
     def unlike(self, event_id: int) -> None:
-        try:
-            r = requests.delete(f"{BASE}/reactions", json={"event_id": event_id, "type": "LIKE"}, timeout=10)
-        except TypeError:
-            r = requests.delete(f"{BASE}/reactions", params={"event_id": event_id, "type": "LIKE"}, timeout=10)
+        r = requests.delete(f"{BASE}/reactions", params={"event_id": event_id, "type": "LIKE"}, timeout=10)
         if r.status_code not in (200, 204, 404): r.raise_for_status()
@@ -1,6 +1,6 @@
 # client/views/details_view.py
 # -*- coding: utf-8 -*-
-import os, requests
+import os, uuid, requests
 from threading import Thread
 from datetime import datetime
 
@@ -10,6 +10,7 @@ from PySide6.QtWidgets import (
 )
 
 from ..ui import Card, SectionTitle, PageTitle, Muted
+from ..services.events_service import EventsService
 
 GATEWAY_BASE_URL = os.getenv("GATEWAY_BASE_URL", "http://127.0.0.1:9000")
 
@@ -138,9 +139,8 @@ class DetailsView(QWidget):
 
         def _work():
             try:
-                r = requests.get(f"{GATEWAY_BASE_URL}/events/{event_id}", timeout=10)
-                r.raise_for_status()
-                data = r.json() or {}
+                # ETag: חזרה לאירוע שכבר נטען עולה 304 בלבד
+                data = EventsService().get_event(int(event_id))
             except Exception as e:
                 data = {"title": "שגיאה בטעינת אירוע", "description": str(e), "_error": True}
             self._dataReady.emit(data)
@@ -195,16 +195,11 @@ class DetailsView(QWidget):
         def _work():
             # נבדוק אם כבר יש לייק לאירוע הזה
             try:
-                url = f"{GATEWAY_BASE_URL}/reactions/me"
-                params = {"type": "LIKE", "event_id": self._event_id}
+                url = f"{GATEWAY_BASE_URL}/reactions/me/state"
+                params = {"event_ids": self._event_id}
                 r = requests.get(url, headers=headers, params=params, timeout=8)
                 if r.status_code == 200:
-                    js = r.json()
-                    liked = False
-                    if isinstance(js, dict) and "liked" in js:
-                        liked = bool(js.get("liked"))
-                    elif isinstance(js, list):
-                        liked = any(str(x.get("event_id")) == str(self._event_id) for x in js)
+                    liked = int(self._event_id) in ((r.json() or {}).get("liked") or [])
                     self._likeState.emit({"phase": "liked" if liked else "unliked", "code": None, "msg": None})
                     return
             except Exception:
@@ -228,8 +223,14 @@ class DetailsView(QWidget):
         def _work():
             try:
                 payload = {"event_id": self._event_id, "type": "LIKE"}
-                r = requests.post(f"{GATEWAY_BASE_URL}/reactions",
-                                  headers=self._headers(), json=payload, timeout=10)
+                # אותו Idempotency-Key בניסיון החוזר → השרת מחזיר את התשובה השמורה
+                headers = {**self._headers(), "Idempotency-Key": uuid.uuid4().hex}
+                try:
+                    r = requests.post(f"{GATEWAY_BASE_URL}/reactions",
+                                      headers=headers, json=payload, timeout=10)
+                except (requests.Timeout, requests.ConnectionError):
+                    r = requests.post(f"{GATEWAY_BASE_URL}/reactions",
+                                      headers=headers, json=payload, timeout=10)
                 # 200/201/204 = הצלחה; 409 (כבר קיים) נחשב כהצלחה
                 if r.status_code in (200, 201, 204, 409):
                     self._likeState.emit({"phase": "liked", "code": None, "msg": None})
@@ -247,10 +248,7 @@ class DetailsView(QWidget):
             try:
                 headers = self._headers()
                 url = f"{GATEWAY_BASE_URL}/reactions"
-                try:
-                    r = requests.delete(url, headers=headers, json={"event_id": self._event_id, "type": "LIKE"}, timeout=10)
-                except TypeError:
-                    r = requests.delete(url, headers=headers, params={"event_id": self._event_id, "type": "LIKE"}, timeout=10)
+                r = requests.delete(url, headers=headers, params={"event_id": self._event_id, "type": "LIKE"}, timeout=10)
 
                 if r.status_code in (200, 204, 404):
                     # גם אם 404 (לא היה לייק) – מבחינת UI אנחנו "לא אוהבים"
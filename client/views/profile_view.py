@@ -171,7 +171,7 @@ class ProfileView(QWidget):
         try:
             me = self._get("/users/me")
             likes = self._get("/reactions/me", params={"type": "LIKE"})
-            self._dataReady.emit({"me": me, "likes": likes})
+            self._dataReady.emit({"me": me, "likes": likes, "events": self._fetch_liked_events(likes)})
         except requests.HTTPError as e:
             code = e.response.status_code if e.response is not None else 0
             if code in (401, 403):
@@ -181,6 +181,18 @@ class ProfileView(QWidget):
         except Exception as e:
             self._dataReady.emit({"error": str(e)})
 
+    def _fetch_liked_events(self, likes: list) -> Dict[int, Dict[str, Any]]:
+        """כל האירועים שאהבתי בקריאה אחת (GET /events?ids=...) במקום קריאה לכל אירוע."""
+        ids = [str(r.get("event_id")) for r in likes or [] if r.get("event_id") is not None]
+        if not ids:
+            return {}
+        try:
+            data = self._get("/events", params={"ids": ",".join(ids[:100])})
+            return {int(ev["id"]): ev for ev in (data or {}).get("items", [])}
+        except Exception as e:
+            print("⚠️ Error fetching liked events:", e)
+            return {}
+
     # ---- render ----
     def _render(self, data: dict):
         if data.get("unauthorized"):
@@ -202,6 +214,7 @@ class ProfileView(QWidget):
 
         me = data.get("me") or {}
         likes = data.get("likes") or []
+        events = data.get("events") or {}
 
         username = str(me.get("username") or "—")
         self.lbl_username.setText(username)
@@ -212,7 +225,7 @@ class ProfileView(QWidget):
         rows: List[Dict[str, Any]] = []
         for r in likes:
             eid = r.get("event_id")
-            title = f"Event #{eid}"
+            title = (events.get(eid) or {}).get("title") or f"Event #{eid}"
             rows.append({"event_id": eid, "title": title})
 
         self.likes_table.setRowCount(len(rows))
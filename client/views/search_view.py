@@ -20,6 +20,7 @@ class SearchView(QWidget):
     searchRequested = Signal(str, dict)
     openDetails = Signal(str)
     _dataReady = Signal(list)
+    _facetsReady = Signal(dict)
 
     _HEB_CITY_MAP = {
         "תל אביב": "Tel Aviv", "ת״א": "Tel Aviv", "ת\"א": "Tel Aviv",
@@ -101,6 +102,8 @@ class SearchView(QWidget):
 
         # חיבור עדכון נתונים מה־Thread
         self._dataReady.connect(self._render_events)
+        self._facetsReady.connect(self._apply_facets)
+        self._load_facets()
 
         # טעינת ברירת מחדל
         self._load_and_render()
@@ -192,6 +195,7 @@ class SearchView(QWidget):
             "q": q or None,
             "page": 1,
             "limit": 12,
+            "count": "estimated",  # לא מציגים total – חוסך COUNT בשרת
         }
 
         # מיזוג פילטרים (למשל עיר)
@@ -217,6 +221,29 @@ class SearchView(QWidget):
             print("⚠️ Error fetching events from Gateway:", e)
             return []
 
+    def _fetch_facets(self) -> Dict[str, Any]:
+        try:
+            r = requests.get(f"{GATEWAY_BASE_URL}/events/facets", timeout=10)
+            r.raise_for_status()
+            return r.json() or {}
+        except Exception as e:
+            print("⚠️ Error fetching facets from Gateway:", e)
+            return {}
+
+    def _apply_facets(self, facets: Dict[str, Any]) -> None:
+        """ממלא את רשימת הערים מהקטלוג בפועל (נשאר עם ברירת המחדל אם נכשל)."""
+        cities = [f.get("value") for f in facets.get("city", []) if f.get("value")]
+        if not cities:
+            return
+        combo = self.searchbar.city
+        current = combo.currentText()
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItems(["כל הערים", *cities])
+        idx = combo.findText(current)
+        combo.setCurrentIndex(idx if idx >= 0 else 0)
+        combo.blockSignals(False)
+
     # ---------- Rendering ----------
     def _render_events(self, events: List[Dict[str, Any]]) -> None:
         self._show_loading(False)
@@ -257,3 +284,6 @@ class SearchView(QWidget):
             self._dataReady.emit(evs)
 
         Thread(target=_work, daemon=True).start()
+
+    def _load_facets(self) -> None:
+        Thread(target=lambda: self._facetsReady.emit(self._fetch_facets()), daemon=True).start()
@@ -10,7 +10,8 @@ except ImportError:
     from server.infra.db import SessionLocal
 
 from server.core.jwt import decode_access_token
-from server.repositories.users_repo import repo_users
+from server.core.token_state import user_from_claims
+from server.repositories.users_repo import get_user_cached
 from server.models.user import UserInDB as User
 
 _security = HTTPBearer(auto_error=True)
@@ -33,8 +34,16 @@ def get_current_user(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid token"
         )
+    try:
+        user = user_from_claims(payload)  # stateless mode: no DB / cache lookup
+    except PermissionError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="token revoked"
+        )
+    if user is not None:
+        return user
     email = payload["sub"]
-    user = repo_users.get_by_email(email)
+    user = get_user_cached(email)  # memory hit for most requests
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="inactive or not found"
@@ -1,11 +1,12 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, status
 from sqlalchemy.orm import Session
 
 from server.core.deps import get_db, get_current_user, require_role
 from server.models.user import UserPublic as User
 from server.models.agent_request import AgentRequestCreate, AgentRequestPublic
 from server.repositories.agent_requests_repo import repo_agent_requests
+from server.infra.idempotency import idempotent
 
 router = APIRouter(prefix="/agent-requests", tags=["agent-requests"])
 
@@ -14,8 +15,12 @@ def create_agent_request(
     body: AgentRequestCreate,
     current: User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ):
-    return repo_agent_requests.create(db, user_id=int(current.id), data=body)
+    return idempotent(
+        db, idempotency_key, int(current.id), "POST /agent-requests", body, status.HTTP_201_CREATED,
+        lambda: repo_agent_requests.create(db, user_id=int(current.id), data=body),
+    )
 
 @router.get("", response_model=List[AgentRequestPublic])
 def list_requests(
@@ -1,17 +1,30 @@
 from fastapi import APIRouter, HTTPException, status
+from starlette.concurrency import run_in_threadpool
 from server.models.user import UserCreate, UserLogin, Token, UserPublic
-from server.repositories.users_repo import repo_users
-from server.core.security import hash_password, verify_password
+from server.repositories.users_repo import repo_users, DuplicateEmailError, DuplicateUsernameError
+from server.core.security import hash_password_async, verify_password_async, PasswordBusyError
+from server.core.config import settings
 from server.core.jwt import create_access_token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+def _busy() -> HTTPException:
+    return HTTPException(status_code=503, detail="server busy, retry shortly", headers={"Retry-After": "1"})
+
 @router.post("/register", response_model=UserPublic, status_code=status.HTTP_201_CREATED)
-def register(body: UserCreate):
-    if repo_users.get_by_email(body.email):
-        raise HTTPException(status_code=400, detail="email already exists")
-    pwd_hash = hash_password(body.password)
-    user = repo_users.create(body, pwd_hash, role="USER")
+async def register(body: UserCreate):
+    # bcrypt on the password executor, DB calls on the regular threadpool
+    try:
+        pwd_hash = await hash_password_async(body.password)
+    except PasswordBusyError:
+        raise _busy()
+    try:
+        # uniqueness is enforced by the DB in the same INSERT
+        user = await run_in_threadpool(repo_users.create, body, pwd_hash, "USER")
+    except DuplicateEmailError:
+        raise HTTPException(status_code=409, detail="email already exists")
+    except DuplicateUsernameError:
+        raise HTTPException(status_code=409, detail="username already exists")
     return UserPublic(
         id=user.id,
         username=user.username,
@@ -22,9 +35,23 @@ def register(body: UserCreate):
     )
 
 @router.post("/login", response_model=Token)
-def login(body: UserLogin):
-    user = repo_users.get_by_email(body.email)
-    if not user or not user.password_hash or not verify_password(body.password, user.password_hash):
+async def login(body: UserLogin):
+    user = await run_in_threadpool(repo_users.get_by_email, body.email)
+    if not user or not user.password_hash:
+        raise HTTPException(status_code=401, detail="invalid credentials")
+    try:
+        ok = await verify_password_async(body.password, user.password_hash)
+    except PasswordBusyError:
+        raise _busy()
+    if not ok:
         raise HTTPException(status_code=401, detail="invalid credentials")
-    token = create_access_token(sub=user.email, role=user.role)
+    claims = {
+        "uid": user.id,
+        "name": user.username,
+        "active": user.is_active,
+        "agent_status": user.agent_status,
+    }
+    if settings.AUTH_STATELESS:
+        claims["tv"] = await run_in_threadpool(repo_users.get_token_version, user.id)
+    token = create_access_token(sub=user.email, role=user.role, extra=claims)
     return Token(access_token=token)
@@ -1,78 +1,250 @@
 # server/api/events.py
-from fastapi import APIRouter, Depends, Query, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.encoders import jsonable_encoder  # ← הוסף שורה זו
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func, literal, union_all
 from decimal import Decimal
-from datetime import datetime
+import hashlib
+import json
+from datetime import date, datetime, time, timedelta
 
 from server.infra.db import get_db
 from server.models.db_models import EventDB
+from server.models.event import EventSort
+from server.repositories.events_repo import SORT_KEYS
+from server.core.pagination import encode_cursor, decode_cursor, keyset_after, keyset_order, InvalidCursorError
+from server.infra import fulltext
+from server.infra.cache import get_cache, events_generation
+from server.core.config import settings
+from server.core.search_keys import canonical_city
 
 router = APIRouter(prefix="/events", tags=["events"])
 
+_count_cache = get_cache(
+    "events.count", maxsize=settings.COUNT_CACHE_SIZE, ttl=settings.COUNT_CACHE_TTL
+)
+# תוצאות מוכנות (payload) – המפתח כולל את ה-generation, כך שכל כתיבה ל-Events מבטלת אותן
+_search_cache = get_cache(
+    "events.search", maxsize=settings.SEARCH_CACHE_SIZE, ttl=settings.SEARCH_CACHE_TTL
+)
+_detail_cache = get_cache(
+    "events.detail", maxsize=settings.EVENT_CACHE_SIZE, ttl=settings.EVENT_CACHE_TTL
+)
+_facets_cache = get_cache("events.facets", maxsize=8, ttl=settings.FACETS_CACHE_TTL)
+
 def _to_iso(dt: datetime | None) -> str | None:
     return dt.isoformat() if isinstance(dt, datetime) else None
 
 def _to_float(x):
     return float(x) if isinstance(x, Decimal) else (x if x is None else float(x))
 
+def _etag(content) -> str:
+    """Weak ETag = hash של ה-payload המסודר (משתנה בדיוק כשהאירוע/התוצאות משתנים)."""
+    raw = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return 'W/"' + hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest() + '"'
+
+def _conditional(request: Request, entry: tuple[str, object]) -> Response:
+    """entry = (etag, content). If-None-Match תואם → 304 בלי body."""
+    etag, content = entry
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    inm = request.headers.get("if-none-match")
+    if inm:
+        tags = {t.strip().removeprefix("W/") for t in inm.split(",")}
+        if "*" in tags or etag.removeprefix("W/") in tags:
+            return Response(status_code=304, headers=headers)
+    return JSONResponse(content=content, headers=headers)
+
+# עמודות לרשימות בלבד: בלי description (NVARCHAR(MAX)) ובלי Url, ובלי hydration של ORM
+_LIST_COLUMNS = (
+    EventDB.Id,
+    EventDB.Title,
+    EventDB.City,
+    EventDB.Venue,
+    EventDB.starts_at,
+    EventDB.Price,
+    EventDB.image_url,
+    EventDB.CreatedAt,  # נדרש ל-cursor
+    EventDB.Category,   # נדרש ל-facets
+)
+
+_FACETS = ("category", "city")
+
+def _list_item(r) -> dict:
+    return {
+        "id": r.Id,
+        "title": r.Title,
+        "city": r.City,
+        "venue": r.Venue,
+        "starts_at": _to_iso(r.starts_at),
+        "price": _to_float(r.Price),
+        "image_url": r.image_url,
+    }
+
+def _parse_facets(facets: str | None) -> tuple[str, ...]:
+    names = tuple(dict.fromkeys(f.strip().lower() for f in (facets or "").split(",") if f.strip()))
+    bad = [n for n in names if n not in _FACETS]
+    if bad:
+        raise HTTPException(status_code=400, detail=f"unknown facet(s): {', '.join(bad)}")
+    return names
+
+def _facet_counts(db: Session, base, names: tuple[str, ...]) -> dict:
+    """כל ה-facets בשאילתה אחת: GROUP BY לכל facet, מאוחדים ב-UNION ALL."""
+    sub = base.subquery()
+    cols = {"category": sub.c.Category, "city": sub.c.City}
+    parts = [
+        select(literal(n).label("facet"), cols[n].label("value"), func.count().label("n"))
+        .where(cols[n].is_not(None))
+        .group_by(cols[n])
+        for n in names
+    ]
+    stmt = parts[0] if len(parts) == 1 else union_all(*parts)
+    out: dict = {n: [] for n in names}
+    for r in db.execute(stmt).all():
+        out[r.facet].append({"value": r.value, "count": int(r.n)})
+    for n in names:
+        out[n].sort(key=lambda x: (-x["count"], x["value"]))
+    return out
+
 # ... למעלה בלי שינוי ...
 
 @router.get("/search")
 def search_events(
+    request: Request,
     q: str | None = Query(None, description="free text: title/city/venue"),
     category: str | None = None,
+    city: str | None = Query(None, description="city (Hebrew names/aliases accepted)"),
+    from_date: date | None = None,
+    to_date: date | None = None,
+    status: str | None = Query(None, description="e.g. PUBLISHED"),
     page: int = 1,
     limit: int = 12,
+    cursor: str | None = Query(None, description="opaque keyset cursor (next_cursor of the previous page)"),
+    sort: EventSort = "recent",
+    count: str = Query("exact", pattern="^(exact|cached|estimated)$",
+                       description="exact | cached (TTL, reset on event writes) | estimated (has_more only)"),
+    facets: str | None = Query(None, description="comma separated: category,city"),
     db: Session = Depends(get_db),
 ):
     page = max(page, 1)
     limit = max(min(limit, 100), 1)
+    try:
+        after = decode_cursor(cursor, 2)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    facet_names = _parse_facets(facets)
+    city = canonical_city(city)
 
-    # 1) בונים WHERE בנפרד בלי ORDER BY
-    base = select(EventDB)
-    if q:
-        like = f"%{q}%"
-        base = base.where(
-            or_(
-                EventDB.Title.ilike(like),
-                EventDB.City.ilike(like),
-                EventDB.Venue.ilike(like),
-            )
-        )
+    q_norm = " ".join((q or "").split()).lower()
+    filters = (q_norm, category or "", city or "", str(from_date or ""), str(to_date or ""), status or "")
+    cache_key = (events_generation(), filters, page, limit, cursor or "", sort, count, facet_names)
+    cached = _search_cache.get(cache_key)
+    if cached is not None:
+        return _conditional(request, cached)
+
+    # 1) בונים WHERE בנפרד בלי ORDER BY (טקסט חופשי דרך אינדקס full-text)
+    base, rank_order = fulltext.apply(select(*_LIST_COLUMNS), q, rank=(sort == "relevance"))
+    if rank_order is not None and after is not None:
+        raise HTTPException(status_code=400, detail="cursor is not supported with sort=relevance")
     if category:
         base = base.where(EventDB.Category == category)
+    # טווח starts_at (+ City/status בתוך האינדקס) → range scan על ix_events_starts_city_status
+    if status:
+        base = base.where(EventDB.status == status)
+    if from_date:
+        base = base.where(EventDB.starts_at >= datetime.combine(from_date, time.min))
+    if to_date:
+        base = base.where(EventDB.starts_at < datetime.combine(to_date + timedelta(days=1), time.min))
+    if city:
+        base = base.where(EventDB.City == city)
+
+    # 2) COUNT ללא ORDER BY (חשוב!) – רק כשבאמת צריך
+    total = None
+    if count != "estimated":
+        count_key = (cache_key[0], filters)
+        total = _count_cache.get(count_key) if count == "cached" else None
+        if total is None:
+            total = db.execute(
+                select(func.count()).select_from(base.subquery())
+            ).scalar_one()
+            if count == "cached":
+                _count_cache.set(count_key, total)
+
+    # 3) מיון רק לשאילתת הדף (relevance: דירוג ואז ברירת המחדל "recent")
+    key_col, desc = SORT_KEYS["recent" if sort == "relevance" else sort]
+    order = keyset_order(key_col, EventDB.Id, desc)
+    stmt = base.order_by(*order)
+    if rank_order is not None:
+        stmt = base.order_by(rank_order, *order)
 
-    # 2) COUNT ללא ORDER BY (חשוב!)
-    total = db.execute(
-        select(func.count()).select_from(base.subquery())
-    ).scalar_one()
+    # 4) cursor => seek על (עמודת המיון, Id) במקום OFFSET; עמוד N עולה כמו עמוד 1
+    if after is not None:
+        stmt = stmt.where(keyset_after(key_col, EventDB.Id, *after, descending=desc))
+        rows = db.execute(stmt.limit(limit + 1)).all()
+    else:
+        offset = (page - 1) * limit
+        rows = db.execute(stmt.offset(offset).limit(limit + 1)).all()
 
-    # 3) מיון רק לשאילתת הדף
-    stmt = base.order_by(EventDB.CreatedAt.desc(), EventDB.Id.desc())
+    next_cursor = None
+    has_more = len(rows) > limit  # שורה limit+1 = יש עוד, בלי COUNT
+    if has_more:
+        rows = rows[:limit]
+        last = rows[-1]
+        if rank_order is None:
+            next_cursor = encode_cursor(getattr(last, key_col.key), last.Id)
 
-    offset = (page - 1) * limit
-    rows = db.execute(stmt.offset(offset).limit(limit)).scalars().all()
+    items = [_list_item(r) for r in rows]
 
-    items = []
-    for e in rows:
-        items.append({
-            "id": getattr(e, "Id", None) or getattr(e, "id", None),
-            "title": getattr(e, "Title", None),
-            "city": getattr(e, "City", None),
-            "venue": getattr(e, "Venue", None),
-            "starts_at": _to_iso(getattr(e, "starts_at", None)), 
-            "price": _to_float(getattr(e, "Price", None)),
-            "image_url": getattr(e, "image_url", None),
-        })
+    payload = {"total": total, "page": page, "limit": limit, "items": items,
+               "has_more": has_more, "next_cursor": next_cursor}
+    if facet_names:
+        payload["facets"] = _facet_counts(db, base, facet_names)
+    content = jsonable_encoder(payload)
+    entry = (_etag(content), content)
+    _search_cache.set(cache_key, entry)
+    return _conditional(request, entry)  # ← זה העיקר
 
-    payload = {"total": total, "page": page, "limit": limit, "items": items}
-    return JSONResponse(content=jsonable_encoder(payload))  # ← זה העיקר
+@router.get("")
+def get_events_batch(
+    ids: str = Query(..., description="comma separated event ids, e.g. 1,2,3"),
+    db: Session = Depends(get_db),
+):
+    """כמה אירועים בשאילתה אחת (WHERE Id IN ...), לפי סדר ה-ids שהתבקשו + רשימת חסרים."""
+    try:
+        wanted = list(dict.fromkeys(int(x) for x in ids.split(",") if x.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma separated integers")
+    if not wanted:
+        raise HTTPException(status_code=400, detail="ids is required")
+    if len(wanted) > settings.EVENTS_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"at most {settings.EVENTS_BATCH_MAX} ids per request")
+
+    rows = db.execute(select(*_LIST_COLUMNS).where(EventDB.Id.in_(wanted))).all()
+    by_id = {r.Id: r for r in rows}
+    payload = {
+        "items": [_list_item(by_id[i]) for i in wanted if i in by_id],
+        "missing": [i for i in wanted if i not in by_id],
+    }
+    return JSONResponse(content=jsonable_encoder(payload))
+
+@router.get("/facets")
+def get_facets(db: Session = Depends(get_db)):
+    """ספירות category/city על כל הקטלוג – מהזיכרון; מחושב מחדש רק אחרי כתיבה ל-Events או TTL."""
+    cache_key = events_generation()
+    cached = _facets_cache.get(cache_key)
+    if cached is not None:
+        return JSONResponse(content=cached)
+    content = jsonable_encoder(_facet_counts(db, select(*_LIST_COLUMNS), _FACETS))
+    _facets_cache.set(cache_key, content)
+    return JSONResponse(content=content)
 
 @router.get("/{event_id}")
-def get_event(event_id: int, db: Session = Depends(get_db)):
+def get_event(event_id: int, request: Request, db: Session = Depends(get_db)):
+    cache_key = (events_generation(), event_id)
+    cached = _detail_cache.get(cache_key)
+    if cached is not None:
+        return _conditional(request, cached)
+
     e = db.get(EventDB, event_id)
     if not e:
         raise HTTPException(status_code=404, detail="Event not found")
@@ -94,5 +266,10 @@ def get_event(event_id: int, db: Session = Depends(get_db)):
         "description": getattr(e, "description", None),
         "image_url": getattr(e, "image_url", None),
         "created_by": getattr(e, "CreatedBy", None),
+        "like_count": getattr(e, "like_count", 0),
+        "save_count": getattr(e, "save_count", 0),
     }
-    return JSONResponse(content=jsonable_encoder(data))
+    content = jsonable_encoder(data)
+    entry = (_etag(content), content)
+    _detail_cache.set(cache_key, entry)
+    return _conditional(request, entry)
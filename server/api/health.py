@@ -1,8 +1,29 @@
 from fastapi import APIRouter
 from server.core.config import settings
+from server.infra.cache import all_stats, events_generation
+from server.infra.db import pool_stats
+from server.core.security import password_pool_stats
+from server.infra.admission import admission
+from server.infra.counters import reaction_counters
 
 router = APIRouter(tags=["health"])
 
 @router.get("/health")
 def health():
     return {"status": "UP", "app": settings.APP_NAME, "env": settings.ENV}
+
+@router.get("/health/cache")
+def cache_stats():
+    return {"events_generation": events_generation(), "caches": all_stats()}
+
+@router.get("/health/pool")
+def db_pool_stats():
+    return {**pool_stats(), "password": password_pool_stats()}
+
+@router.get("/health/admission")
+def admission_stats():
+    return admission.stats()
+
+@router.get("/health/counters")
+def counters_stats():
+    return reaction_counters.stats()
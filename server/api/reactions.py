@@ -1,11 +1,13 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
+from server.core.config import settings
 from server.core.deps import get_db, get_current_user
 from server.models.user import UserPublic as User
-from server.models.reaction import ReactionCreate, ReactionPublic
+from server.models.reaction import ReactionCreate, ReactionPublic, ReactionState, ReactionType
 from server.repositories.reactions_repo import repo_reactions
+from server.infra.idempotency import idempotent
 
 router = APIRouter(prefix="/reactions", tags=["reactions"])
 
@@ -14,8 +16,24 @@ def add_reaction(
     body: ReactionCreate,
     current: User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ):
-    return repo_reactions.add(db, user_id=int(current.id), data=body)
+    return idempotent(
+        db, idempotency_key, int(current.id), "POST /reactions", body, status.HTTP_201_CREATED,
+        lambda: repo_reactions.add(db, user_id=int(current.id), data=body),
+    )
+
+@router.delete("", status_code=status.HTTP_204_NO_CONTENT)
+def remove_reaction_by_event(
+    event_id: int,
+    type: ReactionType = "LIKE",
+    current: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    # DELETE /reactions?event_id=..&type=LIKE – one statement, no id lookup
+    if not repo_reactions.delete_by_key(db, int(current.id), event_id, type):
+        raise HTTPException(status_code=404, detail="reaction not found")
+    return
 
 @router.delete("/{reaction_id}", status_code=status.HTTP_204_NO_CONTENT)
 def remove_reaction(
@@ -43,4 +61,21 @@ def list_my_reactions(
     current: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    return repo_reactions.list_for_user(db, user_id=int(current.id), type=type)
\ No newline at end of file
+    return repo_reactions.list_for_user(db, user_id=int(current.id), type=type)
+
+@router.get("/me/state", response_model=ReactionState)
+def my_reaction_state(
+    event_ids: str = Query(..., description="comma separated event ids, e.g. 1,2,3"),
+    current: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """מצב לייק/שמירה של המשתמש לכמה אירועים בשאילתה אחת (כרטיסי חיפוש / עמוד פרטים)."""
+    try:
+        wanted = list(dict.fromkeys(int(x) for x in event_ids.split(",") if x.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="event_ids must be comma separated integers")
+    if not wanted:
+        raise HTTPException(status_code=400, detail="event_ids is required")
+    if len(wanted) > settings.EVENTS_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"at most {settings.EVENTS_BATCH_MAX} ids per request")
+    return repo_reactions.state_for_user(db, int(current.id), wanted)
@@ -1,24 +1,142 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import io
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from server.core.deps import get_db, get_current_user, require_any
 from server.models.user import UserPublic as User
-from server.models.registration import RegistrationCreate, RegistrationPublic
-from server.repositories.registrations_repo import repo_registrations
+from server.core.config import settings
+from server.models.db_models import EventDB
+from server.models.registration import (
+    RegistrationCreate,
+    RegistrationPublic,
+    SeatsRelease,
+    BulkRegistrationItem,
+    BulkRegistrationRequest,
+    BulkRegistrationResult,
+)
+from server.repositories.registrations_repo import (
+    repo_registrations,
+    AlreadyRegisteredError,
+    SeatsExceedCapacityError,
+)
+from server.infra.admission import admission, AdmissionFullError
+from server.infra.idempotency import idempotent
 
 router = APIRouter(prefix="/registrations", tags=["registrations"])
 
-@router.post("", response_model=RegistrationPublic, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "",
+    response_model=RegistrationPublic,
+    status_code=status.HTTP_201_CREATED,
+    responses={202: {
+        "description": (
+            "only with EVENTHUB_ADMISSION_ENABLED: hot event – queued; poll "
+            "GET /registrations/tickets/{id} (the `poll` field) until status is DONE or FAILED"
+        ),
+    }},
+)
 def create_registration(
     body: RegistrationCreate,
     current: User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ):
-    try:
-        return repo_registrations.create(db, user_id=int(current.id), data=body)
-    except ValueError as ex:
-        raise HTTPException(status_code=404, detail=str(ex))
+    def _create():
+        # hot event (flash sale) → admission queue, answered with a ticket
+        try:
+            ticket = admission.submit(body.event_id, int(current.id), body.quantity)
+        except AdmissionFullError as ex:
+            raise HTTPException(status_code=503, detail=str(ex), headers={"Retry-After": "2"})
+        if ticket is not None:
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={**ticket.to_public(), "poll": f"/registrations/tickets/{ticket.id}"},
+            )
+        try:
+            return repo_registrations.create(db, user_id=int(current.id), data=body)
+        except ValueError as ex:
+            raise HTTPException(status_code=404, detail=str(ex))
+        except AlreadyRegisteredError as ex:
+            raise HTTPException(status_code=409, detail=str(ex))
+        except SeatsExceedCapacityError as ex:
+            raise HTTPException(status_code=422, detail=str(ex))
+
+    return idempotent(
+        db, idempotency_key, int(current.id), "POST /registrations", body, status.HTTP_201_CREATED, _create
+    )
+
+def _parse_csv(text: str, event_id: Optional[int]) -> List[BulkRegistrationItem]:
+    """user_id[,event_id][,quantity] with a header row; ?event_id= fills a missing column."""
+    rows = []
+    reader = csv.DictReader(io.StringIO(text))
+    for i, rec in enumerate(reader, start=1):
+        if None in rec:  # more fields than the header (DictReader puts the extras under None)
+            raise HTTPException(
+                status_code=400, detail=f"invalid CSV row {i} (line {reader.line_num}): too many fields"
+            )
+        rec = {(k or "").strip().lower(): (v or "").strip() for k, v in rec.items()}
+        try:
+            rows.append(BulkRegistrationItem(
+                user_id=rec.get("user_id"),
+                event_id=rec.get("event_id") or event_id,
+                quantity=rec.get("quantity") or 1,
+            ))
+        except ValidationError:
+            raise HTTPException(status_code=400, detail=f"invalid CSV row {i} (line {reader.line_num})")
+    return rows
+
+@router.post("/bulk", response_model=BulkRegistrationResult)
+async def bulk_register(
+    request: Request,
+    event_id: Optional[int] = None,
+    current: User = Depends(require_any("AGENT", "ADMIN")),
+    db: Session = Depends(get_db),
+):
+    """
+    Many registrations in chunked transactions.
+    Body: JSON BulkRegistrationRequest, or text/csv (user_id[,event_id][,quantity]).
+    """
+    raw = await request.body()
+    if "csv" in request.headers.get("content-type", ""):
+        try:
+            text = raw.decode("utf-8-sig")
+        except UnicodeDecodeError as ex:
+            line = raw[:ex.start].count(b"\n") + 1
+            raise HTTPException(status_code=400, detail=f"CSV must be UTF-8 (invalid byte on line {line})")
+        rows = _parse_csv(text, event_id)
+    else:
+        try:
+            rows = BulkRegistrationRequest.model_validate_json(raw or b"{}").rows()
+        except ValidationError as ex:
+            raise HTTPException(status_code=422, detail=ex.errors(include_url=False))
+    if len(rows) > settings.REGISTRATIONS_BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"at most {settings.REGISTRATIONS_BULK_MAX} rows per request")
+
+    results = await run_in_threadpool(
+        repo_registrations.create_bulk, db, rows, settings.REGISTRATIONS_BULK_CHUNK
+    )
+    return BulkRegistrationResult(
+        total=len(results),
+        confirmed=sum(r.status == "CONFIRMED" for r in results),
+        waitlisted=sum(r.status == "WAITLIST" for r in results),
+        errors=sum(r.status == "ERROR" for r in results),
+        results=results,
+    )
+
+@router.get("/tickets/{ticket_id}")
+def get_registration_ticket(
+    ticket_id: str,
+    current: User = Depends(get_current_user),
+):
+    ticket = admission.get_ticket(ticket_id)
+    if not ticket or ticket.user_id != int(current.id):
+        raise HTTPException(status_code=404, detail="ticket not found")
+    return ticket.to_public()
 
 @router.delete("/{registration_id}", status_code=status.HTTP_204_NO_CONTENT)
 def cancel_registration(
@@ -52,3 +170,22 @@ def list_event_registrations(
     db: Session = Depends(get_db),
 ):
     return repo_registrations.list_for_event(db, event_id=event_id, requester=current)
+
+@router.post("/event/{event_id}/release")
+def release_event_seats(
+    event_id: int,
+    body: SeatsRelease,
+    current: User = Depends(require_any("AGENT", "ADMIN")),
+    db: Session = Depends(get_db),
+):
+    """Raise capacity by N seats and promote the waitlist into them (event owner or ADMIN)."""
+    event = db.get(EventDB, event_id)
+    if event is None:
+        raise HTTPException(status_code=404, detail="event not found")
+    if current.role != "ADMIN" and int(event.CreatedBy or 0) != int(current.id):
+        raise HTTPException(status_code=403, detail="forbidden")
+    try:
+        promoted = repo_registrations.release_seats(db, event_id, body.seats)
+    except ValueError as ex:
+        raise HTTPException(status_code=404, detail=str(ex))
+    return {"event_id": event_id, "promoted": promoted}
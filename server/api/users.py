@@ -1,18 +1,28 @@
 # server/api/users.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from server.core.deps import get_db, get_current_user
-from server.core.security import hash_password
+from server.core.security import hash_password_async, PasswordBusyError
 from server.models.user import UserPublic, UserUpdate
-from server.repositories.users_repo import repo_users
+from server.infra.db import engine
+from server.repositories.users_repo import (
+    repo_users,
+    get_user_cached,
+    invalidate_user,
+    revoke_tokens,
+    DuplicateEmailError,
+    DuplicateUsernameError,
+)
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.get("/me", response_model=UserPublic)
 def get_me(current: UserPublic = Depends(get_current_user)):
-    # current כבר מכיל id/username/email/role (מגיע מ-JWT)
-    return current
+    # במצב stateless ה-current נבנה מה-claims של ה-JWT, שעלולים להיות ישנים אחרי
+    # PATCH /users/me; את הפרופיל קוראים מה-cache (ש-update_me מבטל)
+    return get_user_cached(current.email) or current
 
 @router.patch("/me", response_model=UserPublic)
 def update_me(
@@ -21,27 +31,37 @@ def update_me(
 ):
     # מאחר וה-UsersRepository הנוכחי לא כולל update, נעדכן ברמת DB "ידנית".
     # אפשר להרחיב את הרפוזיטורי אם תרצי. כאן נשתמש בחיבור ישיר לפי הדוגמה הקיימת.
-    from server.repositories.users_repo import _conn  # reuse same DSN
+    from server.repositories.users_repo import _conn, _map_integrity_error  # reuse same DSN
     fields = []
     values = []
     if body.username is not None:
-        fields.append("Username = ?")
-        values.append(body.username.strip())
+        fields.append("Username = ?, UsernameNorm = ?")
+        values.extend([body.username.strip(), body.username.strip().lower()])
     if body.role is not None:
         fields.append("role = ?")
         values.append(body.role.upper())
     if not fields:
         return current
     values.append(int(current.id))
-    with _conn() as conn:
-        cur = conn.cursor()
-        cur.execute(
-            f"UPDATE Users SET {', '.join(fields)} WHERE Id = ?",
-            tuple(values),
-        )
-        # קראי חזרה את המשתמש
-        cur.execute("SELECT Id, Username, Email, password_hash, role, is_active FROM Users WHERE Id = ?", (int(current.id),))
-        row = cur.fetchone()
+    try:
+        with _conn() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                f"UPDATE Users SET {', '.join(fields)} WHERE Id = ?",
+                tuple(values),
+            )
+            # קראי חזרה את המשתמש
+            cur.execute("SELECT Id, Username, Email, password_hash, role, is_active FROM Users WHERE Id = ?", (int(current.id),))
+            row = cur.fetchone()
+    except engine.dialect.dbapi.IntegrityError as e:
+        err = _map_integrity_error(e)
+        # רק Username משתנה כאן, אז כל הפרת ייחודיות היא שם משתמש תפוס
+        if isinstance(err, (DuplicateUsernameError, DuplicateEmailError)):
+            raise HTTPException(status_code=409, detail="username already exists")
+        raise HTTPException(status_code=400, detail=str(err))
+    invalidate_user(user_id=int(current.id), email=current.email)
+    if body.role is not None and body.role.upper() != current.role:
+        revoke_tokens(int(current.id), current.email)  # role is a token claim
     if not row:
         raise HTTPException(status_code=404, detail="user not found")
     # המרה חזרה ל-UserPublic לפי הצורה הקיימת
@@ -59,15 +79,22 @@ class PasswordChangeBody(UserUpdate):
     password: str | None = None
 
 @router.post("/me/password", status_code=status.HTTP_204_NO_CONTENT)
-def change_password(
+async def change_password(
     body: PasswordChangeBody,
     current: UserPublic = Depends(get_current_user),
 ):
     if not body.password or len(body.password) < 6:
         raise HTTPException(status_code=400, detail="password too short")
-    pwd_hash = hash_password(body.password)
+    try:
+        pwd_hash = await hash_password_async(body.password)
+    except PasswordBusyError:
+        raise HTTPException(status_code=503, detail="server busy, retry shortly", headers={"Retry-After": "1"})
+    await run_in_threadpool(_store_password, int(current.id), current.email, pwd_hash)
+    return
+
+def _store_password(user_id: int, email: str, pwd_hash: str) -> None:
     from server.repositories.users_repo import _conn
     with _conn() as conn:
         cur = conn.cursor()
-        cur.execute("UPDATE Users SET password_hash = ? WHERE Id = ?", (pwd_hash, int(current.id)))
-    return
+        cur.execute("UPDATE Users SET password_hash = ? WHERE Id = ?", (pwd_hash, user_id))
+    revoke_tokens(user_id, email)
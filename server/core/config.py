@@ -19,9 +19,75 @@ class Settings(BaseSettings):
 
     DB_URL: str = Field(default="sqlite:///./eventhub.db", alias="DATABASE_URL")
 
+    # shared SQLAlchemy pool (ORM sessions + users repo raw connections)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 5
+    DB_POOL_RECYCLE: int = 1800  # seconds
+
+    # auto | fts5 | mssql | like  (see server/infra/fulltext.py)
+    FULLTEXT_BACKEND: str = "auto"
+    SEARCH_KEY_REFRESH_SECONDS: int = 60  # re-key rows written outside the API (0 = migrate only)
+
+    # /events/search?count=cached
+    COUNT_CACHE_TTL: int = 60
+    COUNT_CACHE_SIZE: int = 2048
+
+    # in-process result caches for /events/search and /events/{id}
+    SEARCH_CACHE_TTL: int = 30
+    SEARCH_CACHE_SIZE: int = 1024
+    EVENT_CACHE_TTL: int = 120
+    EVENT_CACHE_SIZE: int = 4096
+    FACETS_CACHE_TTL: int = 300
+
+    # GET /events?ids=...
+    EVENTS_BATCH_MAX: int = 100
+
+    # get_current_user cache (server/repositories/users_repo.py)
+    USER_CACHE_TTL: int = 60
+    USER_CACHE_SIZE: int = 4096
+
+    # claims-only auth, see server/core/token_state.py
+    AUTH_STATELESS: bool = False
+    TOKEN_STATE_REFRESH: int = 30  # seconds
+
+    # bcrypt executor (server/core/security.py); 0 workers = os.cpu_count()
+    PASSWORD_WORKERS: int = 0
+    PASSWORD_QUEUE_MAX: int = 64
+
+    # flash-sale admission queue (server/infra/admission.py)
+    # opt-in: when on, POST /registrations may answer 202 + ticket instead of 201;
+    # "local" tickets live in one process → single uvicorn worker only
+    ADMISSION_ENABLED: bool = False
+    ADMISSION_BROKER: str = "local"
+    ADMISSION_HOT_THRESHOLD: int = 50      # registrations per window → hot (0 = only pinned ids)
+    ADMISSION_HOT_WINDOW: float = 1.0      # seconds
+    ADMISSION_HOT_COOLDOWN: float = 30.0   # seconds an event stays hot after the last attempt
+    ADMISSION_HOT_EVENTS: str = ""         # comma-separated event ids that are always queued
+    ADMISSION_BATCH_MAX: int = 100
+    ADMISSION_BATCH_WAIT_MS: int = 20
+    ADMISSION_QUEUE_MAX: int = 10000
+    ADMISSION_TICKET_TTL: int = 600
+
+    # POST /registrations/bulk
+    REGISTRATIONS_BULK_MAX: int = 10000
+    REGISTRATIONS_BULK_CHUNK: int = 500
+
+    # Idempotency-Key store (server/infra/idempotency.py)
+    IDEMPOTENCY_TTL: int = 86400  # seconds
+    IDEMPOTENCY_LEASE_SECONDS: int = 60  # unfinished reservation older than this can be taken over
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+
+    # Events.like_count/save_count write-behind (server/infra/counters.py)
+    REACTION_FLUSH_MS: int = 200
+    REACTION_FLUSH_MAX: int = 500          # pending events that force an early flush
+    REACTION_RECONCILE_SECONDS: int = 900  # 0 = only at migrate time
+    REACTION_RECONCILE_QUIET: float = 10.0  # recount only events with no reaction for this long
+
     JWT_SECRET: str = "replace-me"
     JWT_ALG: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    JWT_CACHE_SIZE: int = 10000  # verified-claims cache (server/core/jwt.py)
 
     GATEWAY_BASE_URL: str = "http://localhost:9000"
     TM_API_KEY: str | None = None
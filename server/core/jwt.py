@@ -1,18 +1,27 @@
 from __future__ import annotations
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
 from jose import jwt, JWTError
 
+from server.infra.cache import get_cache
+
 # Adjust to your settings module if different
 try:
     from server.core.config import settings
     SECRET = getattr(settings, "JWT_SECRET", "change-me")
     ALGO = getattr(settings, "JWT_ALGORITHM", "HS256")
     EXPIRES_MIN = int(getattr(settings, "JWT_EXPIRES_MINUTES", 60))
+    CACHE_SIZE = int(getattr(settings, "JWT_CACHE_SIZE", 10000))
 except Exception:
     SECRET = "change-me"
     ALGO = "HS256"
     EXPIRES_MIN = 60
+    CACHE_SIZE = 10000
+
+# sha256(token) -> verified claims, each entry lives until the token's `exp`
+_claims_cache = get_cache("jwt_claims", maxsize=CACHE_SIZE, ttl=EXPIRES_MIN * 60)
 
 def create_access_token(sub: str, role: str, extra: Optional[Dict[str, Any]] = None) -> str:
     now = datetime.now(timezone.utc)
@@ -23,8 +32,25 @@ def create_access_token(sub: str, role: str, extra: Optional[Dict[str, Any]] = N
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET, algorithm=ALGO)
 
-def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
+def _verify(token: str) -> Optional[Dict[str, Any]]:
     try:
         return jwt.decode(token, SECRET, algorithms=[ALGO])
     except JWTError:
         return None
+
+def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Verified claims or None. A client reuses one token for the whole session,
+    so the signature check runs once per token; invalid tokens are not cached.
+    """
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    claims = _claims_cache.get(key)
+    if claims is None:
+        claims = _verify(token)
+        if claims is None:
+            return None
+        ttl = float(claims.get("exp", 0)) - time.time()
+        if ttl <= 0:  # jose enforces exp; tokens without one are just not cached
+            return dict(claims)
+        _claims_cache.set(key, claims, ttl=ttl)
+    return dict(claims)  # callers may mutate their copy
@@ -0,0 +1,66 @@
+# server/core/pagination.py
+from __future__ import annotations
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import and_, case, or_
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def _encode_value(v: Any) -> Any:
+    if isinstance(v, datetime):
+        return {"dt": v.isoformat()}
+    return v
+
+
+def _decode_value(v: Any) -> Any:
+    if isinstance(v, dict) and "dt" in v:
+        return datetime.fromisoformat(v["dt"])
+    return v
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Opaque keyset cursor: the sort-key tuple of the last row on a page
+    (e.g. (CreatedAt, Id)), serialized to url-safe base64 JSON.
+    """
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def keyset_order(col: Any, id_col: Any, descending: bool = False) -> Tuple[Any, ...]:
+    """
+    ORDER BY (col, id) in one direction, NULL col values last.
+    SQL Server and SQLite both sort NULL first ascending / last descending.
+    """
+    if descending:
+        return (col.desc(), id_col.desc())
+    return (case((col.is_(None), 1), else_=0).asc(), col.asc(), id_col.asc())
+
+
+def keyset_after(col: Any, id_col: Any, value: Any, last_id: Any, descending: bool = False) -> Any:
+    """Seek predicate: rows after (value, last_id) in keyset_order(col, id_col, descending)."""
+    def past(a: Any, b: Any) -> Any:
+        return a < b if descending else a > b
+
+    if value is None:  # already in the NULL tail
+        return and_(col.is_(None), past(id_col, last_id))
+    return or_(past(col, value), and_(col == value, past(id_col, last_id)), col.is_(None))
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[Tuple[Any, ...]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("bad cursor shape")
+        return tuple(_decode_value(v) for v in values)
+    except Exception as e:
+        raise InvalidCursorError("invalid cursor") from e
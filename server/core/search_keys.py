@@ -0,0 +1,124 @@
+# server/core/search_keys.py
+"""
+Normalized search keys for Events (Hebrew ↔ English).
+
+The same pipeline runs on stored events (Events.SearchKey) and on incoming
+queries, so matching is plain equality / prefix / token lookups:
+- NFKC + lowercase, niqqud removed, Hebrew final letters folded (ך→כ ...)
+- quotes/geresh dropped (ת"א → תא, Ra'anana → raanana), other punctuation → space
+- city aliases applied (Hebrew names and common spellings → canonical English),
+  also behind Hebrew prefix letters ("בתל אביב", "לחיפה", "ובירושלים")
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Dict, List, Optional
+
+# display name used in Events.City ← aliases (mirrors client SearchView._HEB_CITY_MAP)
+CITY_ALIASES: Dict[str, List[str]] = {
+    "Tel Aviv": ["תל אביב", "תל אביב יפו", "ת\"א", "תא", "tlv", "tel aviv yafo", "tel-aviv"],
+    "Haifa": ["חיפה"],
+    "Jerusalem": ["ירושלים", "jlm"],
+    "Beer Sheva": ["באר שבע", "ב\"ש", "beersheba", "beer sheba", "be'er sheva"],
+    "Ashdod": ["אשדוד"],
+    "Netanya": ["נתניה"],
+    "Rehovot": ["רחובות"],
+    "Herzliya": ["הרצליה"],
+    "Ra'anana": ["רעננה"],
+    "Modi'in": ["מודיעין"],
+    "Holon": ["חולון"],
+    "Bat Yam": ["בת ים"],
+    "Petah Tikva": ["פתח תקווה", "פתח תקוה", "petah tiqva"],
+    "Rishon LeZion": ["ראשון לציון", "ראשלצ", "rishon lezion"],
+}
+
+KEY_MAX_LEN = 400  # Events.SearchKey length
+
+_FINALS = str.maketrans({"ך": "כ", "ם": "מ", "ן": "נ", "ף": "פ", "ץ": "צ"})
+_NIQQUD_RE = re.compile(r"[֑-ׇ]")
+_QUOTES_RE = re.compile(r"[\"'`׳״‘’“”]")
+_NON_WORD_RE = re.compile(r"[^\w]+", re.UNICODE)
+_HEB_PREFIXES = "ובהלמשכ"
+
+
+def _basic(s: Optional[str]) -> str:
+    s = unicodedata.normalize("NFKC", s or "").lower()
+    s = _NIQQUD_RE.sub("", s).translate(_FINALS)
+    s = _QUOTES_RE.sub("", s)
+    return " ".join(_NON_WORD_RE.sub(" ", s).split())
+
+
+# normalized alias phrase → normalized canonical city
+_ALIAS_INDEX: Dict[str, str] = {}
+# normalized canonical city → display name
+_CANONICAL: Dict[str, str] = {}
+for _display, _aliases in CITY_ALIASES.items():
+    _canon = _basic(_display)
+    _CANONICAL[_canon] = _display
+    for _a in (_display, *_aliases):
+        _ALIAS_INDEX[_basic(_a)] = _canon
+_MAX_ALIAS_WORDS = max(len(a.split()) for a in _ALIAS_INDEX)
+
+
+def _prefix_variants(token: str) -> List[str]:
+    out = [token]
+    t = token
+    for _ in range(2):  # up to two prefix letters: ו+ב, ש+ב ...
+        if len(t) > 2 and t[0] in _HEB_PREFIXES:
+            t = t[1:]
+            out.append(t)
+        else:
+            break
+    return out
+
+
+def _apply_aliases(tokens: List[str]) -> List[str]:
+    out: List[str] = []
+    i = 0
+    while i < len(tokens):
+        for n in range(min(_MAX_ALIAS_WORDS, len(tokens) - i), 0, -1):
+            rest = tokens[i + 1:i + n]
+            hit = next(
+                (
+                    _ALIAS_INDEX[key]
+                    for v in _prefix_variants(tokens[i])
+                    if (key := " ".join([v, *rest])) in _ALIAS_INDEX
+                ),
+                None,
+            )
+            if hit:
+                out.extend(hit.split())
+                i += n
+                break
+        else:
+            out.append(tokens[i])
+            i += 1
+    return out
+
+
+def normalize_query(s: Optional[str]) -> str:
+    """Normalize free text (query or stored field) into search-key form."""
+    return " ".join(_apply_aliases(_basic(s).split()))
+
+
+def is_city(normalized: str) -> bool:
+    return normalized in _CANONICAL
+
+
+def canonical_city(s: Optional[str]) -> Optional[str]:
+    """'בתל אביב' / 'tlv' / 'Tel Aviv' → 'Tel Aviv' (display form); unknown → stripped input."""
+    n = normalize_query(s)
+    return _CANONICAL.get(n, (s or "").strip() or None)
+
+
+def build_search_key(
+    city: Optional[str],
+    title: Optional[str],
+    venue: Optional[str] = None,
+    category: Optional[str] = None,
+) -> str:
+    # city first: a city query becomes an indexed prefix probe on SearchKey
+    parts = [normalize_query(p) for p in (city, title, venue, category)]
+    return " ".join(p for p in parts if p)[:KEY_MAX_LEN]
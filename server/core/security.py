@@ -1,5 +1,13 @@
+from __future__ import annotations
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from passlib.context import CryptContext
 
+from server.core.config import settings
+
 _pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def hash_password(plain: str) -> str:
@@ -7,3 +15,48 @@ def hash_password(plain: str) -> str:
 
 def verify_password(plain: str, hashed: str) -> bool:
     return _pwd.verify(plain, hashed)
+
+
+# ---------------- bounded executor for async endpoints ----------------
+# bcrypt releases the GIL, so a dedicated thread pool sized to the cores runs
+# hashes in parallel without taking slots from Starlette's shared threadpool
+# (DB-bound sync endpoints keep their workers during a login storm).
+
+class PasswordBusyError(RuntimeError):
+    """Too many password operations queued – callers answer 503."""
+
+
+_workers = settings.PASSWORD_WORKERS or (os.cpu_count() or 2)
+_executor = ThreadPoolExecutor(max_workers=_workers, thread_name_prefix="pwd")
+_slots = threading.BoundedSemaphore(_workers + settings.PASSWORD_QUEUE_MAX)
+_stats = {"submitted": 0, "rejected": 0, "in_flight": 0}
+_stats_lock = threading.Lock()
+
+
+async def _run(fn, *args):
+    if not _slots.acquire(blocking=False):
+        with _stats_lock:
+            _stats["rejected"] += 1
+        raise PasswordBusyError("password queue is full")
+    with _stats_lock:
+        _stats["submitted"] += 1
+        _stats["in_flight"] += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    finally:
+        with _stats_lock:
+            _stats["in_flight"] -= 1
+        _slots.release()
+
+
+async def hash_password_async(plain: str) -> str:
+    return await _run(hash_password, plain)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await _run(verify_password, plain, hashed)
+
+
+def password_pool_stats() -> dict:
+    with _stats_lock:
+        return {"workers": _workers, "queue_max": settings.PASSWORD_QUEUE_MAX, **_stats}
@@ -0,0 +1,115 @@
+# server/core/token_state.py
+"""
+Stateless auth (EVENTHUB_AUTH_STATELESS=1): trust the JWT claims
+(uid, name, role, active, tv) instead of reading Users on every request.
+
+Revocation is a compact per-process table {user_id: (token_version, is_active)}
+holding only users whose tokens were ever revoked (token_version > 0) or who
+are inactive. It is reloaded from the DB every TOKEN_STATE_REFRESH seconds
+(lazily, by one request at a time), so other workers see a revocation within
+that window; the worker that made the change sees it immediately (`note`).
+A token is rejected when its `tv` is below the stored version.
+
+Versions only go up: `note` keeps the highest version seen, and a reload
+that started before a `note` cannot lower it - local notes are kept on top of
+the loaded table until the DB shows the same (or a newer) version.
+
+Profile fields in the claims (name, agent_status) may be stale until the next
+login; endpoints that show the profile (GET /users/me) read it from the user
+cache instead. Changing the role revokes the tokens.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from server.core.config import settings
+from server.models.user import UserInDB
+
+State = Tuple[int, bool]  # (token_version, is_active)
+
+
+class TokenStateTable:
+    def __init__(self, loader: Callable[[], Dict[int, State]], refresh_seconds: float) -> None:
+        self._loader = loader
+        self._refresh = float(refresh_seconds)
+        self._states: Dict[int, State] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._noted: Dict[int, State] = {}  # local notes the DB may not show yet
+        self._note_lock = threading.Lock()
+
+    def _maybe_refresh(self) -> None:
+        now = time.monotonic()
+        if self._loaded_at is not None and now - self._loaded_at < self._refresh:
+            return
+        # first load blocks; later reloads are done by whoever grabs the lock,
+        # everyone else keeps using the current table
+        if not self._lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            if self._loaded_at is None or now - self._loaded_at >= self._refresh:
+                states = self._loader()
+                with self._note_lock:
+                    for uid, noted in list(self._noted.items()):
+                        loaded = states.get(uid)
+                        if loaded is not None and loaded[0] >= noted[0]:
+                            del self._noted[uid]  # the DB caught up
+                        else:
+                            states[uid] = noted
+                    self._states = states
+                self._loaded_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def is_valid(self, user_id: int, token_version: int) -> bool:
+        self._maybe_refresh()
+        state = self._states.get(int(user_id))
+        if state is None:
+            return True
+        version, active = state
+        return active and int(token_version) >= version
+
+    def note(self, user_id: int, token_version: int, is_active: bool = True) -> None:
+        uid = int(user_id)
+        with self._note_lock:
+            current = self._states.get(uid)
+            if current is not None and current[0] > int(token_version):
+                return  # never go back to an older version
+            state = (int(token_version), bool(is_active))
+            self._noted[uid] = state
+            states = dict(self._states)
+            states[uid] = state
+            self._states = states
+
+
+def _load_states() -> Dict[int, State]:
+    from server.repositories.users_repo import repo_users
+    return repo_users.token_states()
+
+
+token_states = TokenStateTable(_load_states, settings.TOKEN_STATE_REFRESH)
+
+
+def user_from_claims(payload: Mapping[str, Any]) -> Optional[UserInDB]:
+    """
+    Build the current user from JWT claims when stateless mode is on and the
+    token carries them. Returns None when the caller should fall back to the DB.
+    Raises PermissionError for a revoked / inactive token.
+    """
+    if not settings.AUTH_STATELESS or "uid" not in payload or "tv" not in payload:
+        return None
+    uid = int(payload["uid"])
+    if not payload.get("active", True) or not token_states.is_valid(uid, payload["tv"]):
+        raise PermissionError("token revoked")
+    return UserInDB(
+        id=uid,
+        username=payload.get("name") or payload["sub"].split("@")[0],
+        email=payload["sub"],
+        role=payload.get("role", "USER"),
+        agent_status=payload.get("agent_status", "NONE"),
+        is_active=True,
+        password_hash="",  # never needed past authentication
+    )
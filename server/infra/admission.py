@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+# ================================================================
+#  EventHub Server — infra/admission.py
+# ================================================================
+"""
+📌 Purpose (Explanation Box)
+Admission queue for "hot" events (flash sales / on-sale moments).
+
+Why?
+- When a popular event opens, thousands of POST /registrations hit the same
+  Events row at once; every request opens its own transaction and they all
+  queue on the row lock → lock storms and a p99 that explodes.
+
+How it works:
+- `HotEventDetector` counts registration attempts per event in a sliding
+  window; above ADMISSION_HOT_THRESHOLD (or for ids listed in
+  ADMISSION_HOT_EVENTS) the event is "hot" for ADMISSION_HOT_COOLDOWN seconds.
+- Registrations for a hot event are not executed by the request: they are
+  put on that event's queue and the client gets a ticket (202) to poll.
+- One worker per hot event drains its queue and writes up to
+  ADMISSION_BATCH_MAX registrations per transaction
+  (RegistrationsRepo.create_batch) – one lock, one commit per batch.
+
+Brokers:
+- "local" → in-process queues + worker threads (`LocalBroker`). With several
+  uvicorn workers each process has its own queues; they still serialize on the
+  event row, just with N writers instead of thousands.
+- Another broker (e.g. Redis streams) only needs `submit`, `depth` and `close`.
+
+Notes:
+- Off by default (EVENTHUB_ADMISSION_ENABLED=false). Turning it on changes
+  the POST /registrations contract for hot events: 202 Accepted with
+  {"ticket": <id>, "status": "QUEUED", ..., "poll": "/registrations/tickets/<id>"}
+  instead of 201 + the registration. Clients must poll the ticket until it
+  is DONE (registration inside) or FAILED (error + error_code = the status
+  the direct path would have returned).
+- Tickets live in a TTL cache (ADMISSION_TICKET_TTL) of the process that
+  queued them. With the "local" broker and several uvicorn workers, a poll
+  that lands on another worker gets 404 – enable it with one worker only,
+  or with a shared broker that also stores the tickets.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from server.core.config import settings
+from server.infra.cache import get_cache
+from server.infra.db import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionFullError(RuntimeError):
+    """The event's queue is at ADMISSION_QUEUE_MAX – callers answer 503."""
+
+
+@dataclass
+class Ticket:
+    id: str
+    event_id: int
+    user_id: int
+    quantity: int
+    status: str = "QUEUED"  # QUEUED / DONE / FAILED
+    created_at: float = field(default_factory=time.time)
+    registration: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    error_code: Optional[int] = None  # HTTP status the direct path would have returned
+
+    def to_public(self) -> Dict[str, Any]:
+        return {
+            "ticket": self.id,
+            "event_id": self.event_id,
+            "status": self.status,
+            "registration": self.registration,
+            "error": self.error,
+            "error_code": self.error_code,
+        }
+
+
+# ---------------- hot-event detection ----------------
+class HotEventDetector:
+    def __init__(self, threshold: int, window: float, cooldown: float, pinned: Tuple[int, ...] = ()) -> None:
+        self.threshold = int(threshold)
+        self.window = float(window)
+        self.cooldown = float(cooldown)
+        self.pinned = set(pinned)
+        self._hits: Dict[int, Deque[float]] = {}
+        self._hot_until: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, event_id: int) -> bool:
+        """Record one registration attempt; True when the event is (now) hot."""
+        if event_id in self.pinned:
+            return True
+        if self.threshold <= 0:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if self._hot_until.get(event_id, 0) > now:
+                self._hot_until[event_id] = now + self.cooldown
+                return True
+            hits = self._hits.setdefault(event_id, deque())
+            hits.append(now)
+            while hits and hits[0] <= now - self.window:
+                hits.popleft()
+            if len(hits) >= self.threshold:
+                self._hot_until[event_id] = now + self.cooldown
+                del self._hits[event_id]
+                return True
+            if not hits:
+                del self._hits[event_id]
+            return False
+
+    def hot_events(self) -> List[int]:
+        now = time.monotonic()
+        with self._lock:
+            return sorted({e for e, t in self._hot_until.items() if t > now} | self.pinned)
+
+
+# ---------------- brokers ----------------
+# batch handler: (event_id, [ticket, ...]) -> None; fills ticket.status/result
+BatchHandler = Callable[[int, List[Ticket]], None]
+
+
+class LocalBroker:
+    name = "local"
+
+    def __init__(self, handler: BatchHandler, batch_max: int, batch_wait: float, queue_max: int) -> None:
+        self._handler = handler
+        self._batch_max = max(int(batch_max), 1)
+        self._batch_wait = float(batch_wait)
+        self._queue_max = int(queue_max)
+        self._queues: Dict[int, "queue.Queue[Ticket]"] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, ticket: Ticket) -> None:
+        with self._lock:
+            q = self._queues.get(ticket.event_id)
+            if q is None:
+                q = self._queues[ticket.event_id] = queue.Queue(maxsize=self._queue_max)
+                threading.Thread(
+                    target=self._worker, args=(ticket.event_id, q),
+                    name=f"admission-{ticket.event_id}", daemon=True,
+                ).start()
+            try:
+                q.put_nowait(ticket)
+            except queue.Full:
+                raise AdmissionFullError("registration queue is full")
+
+    def depth(self) -> Dict[int, int]:
+        with self._lock:
+            return {e: q.qsize() for e, q in self._queues.items()}
+
+    def close(self) -> None:
+        with self._lock:
+            for q in self._queues.values():
+                q.put(None)  # type: ignore[arg-type]
+            self._queues.clear()
+
+    def _worker(self, event_id: int, q: "queue.Queue[Ticket]") -> None:
+        idle_exit = max(settings.ADMISSION_HOT_COOLDOWN, 1)
+        while True:
+            try:
+                first = q.get(timeout=idle_exit)
+            except queue.Empty:
+                with self._lock:  # idle: retire this worker unless something arrived meanwhile
+                    if q.empty() and self._queues.get(event_id) is q:
+                        del self._queues[event_id]
+                        return
+                continue
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self._batch_wait
+            while len(batch) < self._batch_max:
+                try:
+                    t = q.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if t is None:
+                    q.put(None)  # type: ignore[arg-type]
+                    break
+                batch.append(t)
+            try:
+                self._handler(event_id, batch)
+            except Exception as e:  # never kill the worker
+                logger.exception(f"admission batch for event {event_id} failed")
+                for t in batch:
+                    if t.status == "QUEUED":
+                        t.status, t.error, t.error_code = "FAILED", f"registration failed: {e}", 500
+
+
+_BROKERS = {"local": LocalBroker}
+
+
+# ---------------- facade ----------------
+def _write_batch(event_id: int, tickets: List[Ticket]) -> None:
+    from server.repositories.registrations_repo import (
+        repo_registrations, AlreadyRegisteredError, SeatsExceedCapacityError,
+    )
+    with SessionLocal() as db:
+        results = repo_registrations.create_batch(db, event_id, [(t.user_id, t.quantity) for t in tickets])
+    for t, r in zip(tickets, results):
+        if isinstance(r, AlreadyRegisteredError):
+            t.status, t.error, t.error_code = "FAILED", str(r), 409
+        elif isinstance(r, SeatsExceedCapacityError):
+            t.status, t.error, t.error_code = "FAILED", str(r), 422
+        elif isinstance(r, ValueError):
+            t.status, t.error, t.error_code = "FAILED", str(r), 404
+        elif isinstance(r, Exception):
+            t.status, t.error, t.error_code = "FAILED", str(r), 500
+        else:
+            t.status, t.registration = "DONE", r.model_dump(mode="json")
+
+
+def _pinned() -> Tuple[int, ...]:
+    raw = settings.ADMISSION_HOT_EVENTS or ""
+    return tuple(int(x) for x in raw.replace(" ", "").split(",") if x)
+
+
+class AdmissionQueue:
+    def __init__(self) -> None:
+        self.detector = HotEventDetector(
+            settings.ADMISSION_HOT_THRESHOLD,
+            settings.ADMISSION_HOT_WINDOW,
+            settings.ADMISSION_HOT_COOLDOWN,
+            _pinned(),
+        )
+        broker_cls = _BROKERS.get(settings.ADMISSION_BROKER, LocalBroker)
+        self.broker = broker_cls(
+            _write_batch,
+            settings.ADMISSION_BATCH_MAX,
+            settings.ADMISSION_BATCH_WAIT_MS / 1000.0,
+            settings.ADMISSION_QUEUE_MAX,
+        )
+        self._tickets = get_cache("admission_tickets", maxsize=100_000, ttl=settings.ADMISSION_TICKET_TTL)
+
+    def submit(self, event_id: int, user_id: int, quantity: int = 1) -> Optional[Ticket]:
+        """Queue the registration when the event is hot; None → caller writes it directly."""
+        if not settings.ADMISSION_ENABLED or not self.detector.hit(int(event_id)):
+            return None
+        ticket = Ticket(id=uuid.uuid4().hex, event_id=int(event_id), user_id=int(user_id), quantity=int(quantity))
+        self._tickets.set(ticket.id, ticket)
+        try:
+            self.broker.submit(ticket)
+        except AdmissionFullError:
+            self._tickets.pop(ticket.id)
+            raise
+        return ticket
+
+    def get_ticket(self, ticket_id: str) -> Optional[Ticket]:
+        return self._tickets.get(ticket_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.ADMISSION_ENABLED,
+            "broker": self.broker.name,
+            "hot_events": self.detector.hot_events(),
+            "queue_depth": self.broker.depth(),
+        }
+
+
+admission = AdmissionQueue()
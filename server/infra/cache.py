@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# ================================================================
+#  EventHub Server — infra/cache.py
+# ================================================================
+"""
+📌 Purpose (Explanation Box)
+Small in-process caches (LRU + TTL) shared by the API layer.
+
+Highlights:
+- `TTLCache` – thread-safe LRU with a default TTL (overridable per entry)
+  and hit/miss counters.
+- Named registry (`get_cache`) so every cache is visible in one place
+  (`all_stats()`), e.g. for the health router.
+- `events_generation()` – a counter bumped by every Events write
+  (EventsRepo); callers put it in their cache keys, so a write makes
+  older entries unreachable without scanning the cache.
+
+Notes:
+- Per process: with several uvicorn workers each worker has its own caches;
+  TTLs bound how stale a worker can be after a write made by another worker.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0) -> None:
+        self.maxsize = max(int(maxsize), 1)
+        self.ttl = float(ttl)
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] <= now:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires = time.monotonic() + (self.ttl if ttl is None else float(ttl))
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+        return item[1] if item else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._data)
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# ---------------- registry ----------------
+_caches: Dict[str, TTLCache] = {}
+_registry_lock = threading.Lock()
+
+
+def get_cache(name: str, maxsize: int = 1024, ttl: float = 60.0) -> TTLCache:
+    with _registry_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = TTLCache(maxsize=maxsize, ttl=ttl)
+        return cache
+
+
+def all_stats() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        items = list(_caches.items())
+    return {name: c.stats() for name, c in items}
+
+
+# ---------------- Events write generation ----------------
+_events_gen = 0
+_gen_lock = threading.Lock()
+
+
+def events_generation() -> int:
+    return _events_gen
+
+
+def bump_events_generation() -> int:
+    global _events_gen
+    with _gen_lock:
+        _events_gen += 1
+        return _events_gen
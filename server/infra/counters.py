@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+# ================================================================
+#  EventHub Server — infra/counters.py
+# ================================================================
+"""
+📌 Purpose (Explanation Box)
+Write-behind buffer for the denormalized Events.like_count / save_count.
+
+Why?
+- Counting Reactions rows for every page is a table scan, and bumping the
+  Events row inside every like would make a popular event's row the hottest
+  lock in the DB.
+
+How it works:
+- ReactionsRepo reports +1 / -1 after its own commit (`reaction_counters.add`);
+  that is only a dict update in memory.
+- A background thread flushes the coalesced deltas every REACTION_FLUSH_MS,
+  or sooner when REACTION_FLUSH_MAX events are pending: one transaction,
+  one executemany UPDATE (like_count = like_count + :d ...). 1000 likes on
+  one event in a window become a single +1000.
+- On a failed flush the deltas are merged back and retried next round.
+
+Crash safety:
+- Reactions stays the source of truth. Deltas not yet flushed when a process
+  dies are repaired by `reconcile()` – a set-based recount from Reactions –
+  run by migrate.upgrade when the columns appear, and periodically
+  (REACTION_RECONCILE_SECONDS) for the events this process touched.
+- A recount writes absolute values, so it must not overlap a delta that is
+  still on its way (pending here, in another worker's buffer, or committed
+  but not yet add()-ed): it would be counted twice. The periodic recount
+  therefore only takes events with nothing pending that have been quiet for
+  REACTION_RECONCILE_QUIET seconds; an event that gets a reaction while its
+  recount runs is queued for the next round, which repairs any overlap.
+
+Caches:
+- A flush/recount drops the touched events from the "events.detail" cache
+  (GET /events/{id}), so like_count/save_count and the ETag follow the DB.
+  Other workers' copies still expire by EVENT_CACHE_TTL.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.engine import Engine
+
+from server.core.config import settings
+from server.infra.cache import events_generation, get_cache
+from server.infra.db import engine as default_engine
+from server.models.db_models import EventDB, ReactionsDB
+
+logger = logging.getLogger(__name__)
+
+_COLUMN = {"LIKE": "like_count", "SAVE": "save_count"}
+
+
+def _drop_cached_details(event_ids: Iterable[int]) -> None:
+    # same key as server/api/events.py get_event: (events_generation(), event_id)
+    detail = get_cache("events.detail")
+    gen = events_generation()
+    for eid in event_ids:
+        detail.pop((gen, eid))
+
+
+def reconcile(engine: Engine, event_ids: Optional[Iterable[int]] = None) -> int:
+    """Recount like/save counters from Reactions (all events, or just `event_ids`)."""
+    def _count(type_: str):
+        return (
+            select(func.count(ReactionsDB.Id))
+            .where(ReactionsDB.EventId == EventDB.Id, ReactionsDB.type == type_)
+            .scalar_subquery()
+        )
+    stmt = update(EventDB).values(like_count=_count("LIKE"), save_count=_count("SAVE"))
+    if event_ids is not None:
+        ids = list(event_ids)
+        if not ids:
+            return 0
+        stmt = stmt.where(EventDB.Id.in_(ids))
+    with engine.begin() as conn:
+        return conn.execute(stmt).rowcount or 0
+
+
+class ReactionCounterBuffer:
+    def __init__(
+        self, engine: Engine, flush_ms: int, flush_max: int, reconcile_seconds: int, reconcile_quiet: float
+    ) -> None:
+        self._engine = engine
+        self._interval = max(flush_ms, 10) / 1000.0
+        self._flush_max = max(int(flush_max), 1)
+        self._reconcile_every = float(reconcile_seconds)
+        self._quiet = max(float(reconcile_quiet), self._interval * 2)
+        self._pending: Dict[int, Dict[str, int]] = {}
+        self._touched: Set[int] = set()
+        self._last_add: Dict[int, float] = {}  # event id -> monotonic time of its last delta
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_reconcile = time.monotonic()
+        self.flushes = 0
+        self.flushed_deltas = 0
+
+    def add(self, event_id: int, type_: str, delta: int) -> None:
+        col = _COLUMN.get(type_)
+        if not col or not delta:
+            return
+        with self._lock:
+            per_event = self._pending.setdefault(int(event_id), {})
+            per_event[col] = per_event.get(col, 0) + delta
+            if self._reconcile_every > 0:
+                self._last_add[int(event_id)] = time.monotonic()
+            if len(self._pending) >= self._flush_max:
+                self._wake.set()
+        self._ensure_thread()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="reaction-counters", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                if self._reconcile_every > 0 and time.monotonic() - self._last_reconcile >= self._reconcile_every:
+                    self._reconcile_touched()
+            except Exception:
+                logger.exception("reaction counter flush failed; will retry")
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        params = [
+            {"eid": eid, "d_like": d.get("like_count", 0), "d_save": d.get("save_count", 0)}
+            for eid, d in pending.items()
+            if d.get("like_count") or d.get("save_count")
+        ]
+        if not params:
+            return 0
+        stmt = (
+            update(EventDB.__table__)
+            .where(EventDB.__table__.c.Id == bindparam("eid"))
+            .values(
+                like_count=EventDB.__table__.c.like_count + bindparam("d_like"),
+                save_count=EventDB.__table__.c.save_count + bindparam("d_save"),
+            )
+        )
+        try:
+            with self._engine.begin() as conn:
+                conn.execute(stmt, params)  # executemany, one commit
+        except Exception:
+            with self._lock:  # put the deltas back for the next round
+                for eid, d in pending.items():
+                    cur = self._pending.setdefault(eid, {})
+                    for col, v in d.items():
+                        cur[col] = cur.get(col, 0) + v
+            raise
+        with self._lock:
+            self._touched.update(pending)
+        _drop_cached_details(pending)
+        self.flushes += 1
+        self.flushed_deltas += len(params)
+        return len(params)
+
+    def _reconcile_touched(self) -> None:
+        with self._lock:
+            started = time.monotonic()
+            quiet = {
+                eid for eid in self._touched
+                if eid not in self._pending and started - self._last_add.get(eid, 0.0) >= self._quiet
+            }
+            self._touched -= quiet
+        if quiet:
+            reconcile(self._engine, quiet)
+            _drop_cached_details(quiet)
+        with self._lock:
+            raced = {eid for eid in quiet if self._last_add.get(eid, 0.0) >= started}
+            self._touched |= raced  # count may include a delta that is still coming → redo
+            for eid in quiet - raced:
+                self._last_add.pop(eid, None)
+            busy = bool(self._touched)
+        # busy events are retried once they have been quiet, not a full period later
+        self._last_reconcile = started - (self._reconcile_every - self._quiet if busy else 0.0)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = len(self._pending)
+        return {"pending_events": pending, "flushes": self.flushes, "flushed_deltas": self.flushed_deltas}
+
+
+reaction_counters = ReactionCounterBuffer(
+    default_engine,
+    settings.REACTION_FLUSH_MS,
+    settings.REACTION_FLUSH_MAX,
+    settings.REACTION_RECONCILE_SECONDS,
+    settings.REACTION_RECONCILE_QUIET,
+)
+
+
+@atexit.register
+def _flush_on_exit() -> None:
+    try:
+        reaction_counters.flush()
+    except Exception:
+        pass
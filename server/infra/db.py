@@ -1,6 +1,7 @@
 # server/infra/db.py
 from __future__ import annotations
-from sqlalchemy import create_engine
+import threading
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from server.core.config import settings
 
@@ -10,9 +11,10 @@ from server.core.config import settings
 
 engine_kwargs = dict(
     pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-    pool_timeout=5,          
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
 )
 
 engine = create_engine(
@@ -29,3 +31,33 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ---------------- pool metrics ----------------
+_pool_counters = {"connects": 0, "checkouts": 0, "invalidated": 0}
+_pool_lock = threading.Lock()
+
+def _bump(name: str) -> None:
+    with _pool_lock:
+        _pool_counters[name] += 1
+
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_conn, record):
+    _bump("connects")  # new physical connection (handshake + login)
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_conn, record, proxy):
+    _bump("checkouts")
+
+@event.listens_for(engine, "invalidate")
+def _on_invalidate(dbapi_conn, record, exc):
+    _bump("invalidated")  # dropped by pre-ping / error
+
+def pool_stats() -> dict:
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__, **_pool_counters}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, name, None)
+        if callable(fn):
+            stats[name] = fn()
+    return stats
@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+# ================================================================
+#  EventHub Server — infra/fulltext.py
+# ================================================================
+"""
+📌 Purpose (Explanation Box)
+Pluggable full-text search over Events.SearchKey – the normalized
+"city title venue category" key from server/core/search_keys.py.
+Queries are normalized the same way, so Hebrew/English city aliases and
+Hebrew prefix/final letters match; a query that is just a city name is an
+indexed prefix probe on ix_events_search_key and skips full-text entirely.
+
+Backends:
+- "fts5"  → SQLite FTS5 virtual table `EventsFts(SearchKey)` (rowid = Events.Id),
+            kept in sync by EventsRepo.create/update/delete in the same transaction.
+- "mssql" → SQL Server full-text catalog + CONTAINSTABLE
+            (CHANGE_TRACKING AUTO keeps it in sync, so the sync hooks are no-ops).
+- "like"  → `SearchKey LIKE '%q%'`; used when nothing better is available.
+
+How to use:
+    from server.infra import fulltext
+    stmt, rank_order = fulltext.apply(stmt, q, rank=True)
+
+Keeping SearchKey current:
+- Events are written outside this API (imports / SSMS), so the key cannot
+  depend on app write hooks. A DB trigger (migrate.ensure_search_key_trigger)
+  sets SearchKey = NULL whenever Title/City/Venue/Category change without it,
+  and a background refresher (`refresh_keys`, every SEARCH_KEY_REFRESH_SECONDS)
+  recomputes NULL keys, re-indexes them and bumps events_generation.
+- Until then, rows with SearchKey IS NULL are matched on the source columns
+  (case-insensitive LIKE per word over Title/City/Venue/Category), so a fresh
+  event is searchable immediately.
+
+Notes:
+- EVENTHUB_FULLTEXT_BACKEND=auto|fts5|mssql|like (default auto = by DB dialect).
+- The FTS table / full-text index is created by `setup()`, called from
+  migrate.upgrade() – never from a request, where the session already holds
+  a write transaction. At runtime `get_backend()` only detects whether the
+  chosen backend's objects exist; if not, it uses "like" with a warning.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import Float, Integer, and_, func, or_, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, load_only
+
+from server.core.config import settings
+from server.core.search_keys import build_search_key, canonical_city, normalize_query, is_city
+from server.infra.cache import bump_events_generation
+from server.infra.db import engine
+from server.models.db_models import EventDB
+
+logger = logging.getLogger(__name__)
+
+_SOURCE_COLUMNS = (EventDB.Title, EventDB.City, EventDB.Venue, EventDB.Category)
+
+
+def _unkeyed_match(q: str, nq: str) -> Any:
+    """Rows whose SearchKey is not computed yet: every word in some source column."""
+    words = and_(*(
+        or_(*(c.icontains(w, autoescape=True) for c in _SOURCE_COLUMNS)) for w in q.split()
+    ))
+    if is_city(nq):  # "בחיפה" / "tlv" → stored English city name
+        words = or_(EventDB.City == canonical_city(q), words)
+    return and_(EventDB.SearchKey.is_(None), words)
+
+
+class LikeBackend:
+    name = "like"
+
+    def setup(self, engine: Engine) -> None:
+        pass
+
+    def detect(self, engine: Engine) -> bool:
+        return True
+
+    def apply(self, stmt: Any, nq: str, unkeyed: Any, rank: bool = False) -> Tuple[Any, Optional[Any]]:
+        # every token must appear (AND), like the FTS backends – not the whole phrase
+        return stmt.filter(or_(
+            and_(*(EventDB.SearchKey.contains(t, autoescape=True) for t in nq.split())),
+            unkeyed,
+        )), None
+
+    def index_event(self, db: Session, e: EventDB) -> None:
+        pass
+
+    def remove_event(self, db: Session, event_id: int) -> None:
+        pass
+
+
+class _MatchBackend(LikeBackend, ABC):
+    """Shared plumbing: join Events to a (event_id, rank) match subquery."""
+
+    _match_sql = ""
+    _rank_desc = False
+
+    @abstractmethod
+    def _query_string(self, tokens: list[str]) -> str:
+        ...
+
+    def apply(self, stmt: Any, nq: str, unkeyed: Any, rank: bool = False) -> Tuple[Any, Optional[Any]]:
+        tokens = nq.split()
+        sub = (
+            text(self._match_sql)
+            .bindparams(fts_q=self._query_string(tokens))
+            .columns(event_id=Integer, rank=Float)
+            .subquery("fts")
+        )
+        # outer join: not-yet-keyed rows are not in the full-text index (or only
+        # with the text they had before an outside edit nulled their key)
+        stmt = stmt.outerjoin(sub, sub.c.event_id == EventDB.Id).filter(
+            or_(and_(sub.c.event_id.is_not(None), EventDB.SearchKey.is_not(None)), unkeyed)
+        )
+        order = None
+        if rank:
+            score = func.coalesce(sub.c.rank, 0.0)  # unranked rows last (bm25 < 0, RANK > 0)
+            order = score.desc() if self._rank_desc else score.asc()
+        return stmt, order
+
+
+class SqliteFtsBackend(_MatchBackend):
+    name = "fts5"
+    _match_sql = (
+        "SELECT rowid AS event_id, bm25(EventsFts) AS rank "
+        "FROM EventsFts WHERE EventsFts MATCH :fts_q"
+    )
+    _columns = ["SearchKey"]
+    _rank_desc = False  # bm25: lower is better
+
+    def _query_string(self, tokens: list[str]) -> str:
+        # prefix match per token, implicit AND ("tel"* "aviv"*)
+        return " ".join(f'"{t}"*' for t in tokens)
+
+    def _fts_columns(self, conn: Any) -> list[str]:
+        return [r[1] for r in conn.execute(text("PRAGMA table_info(EventsFts)"))]
+
+    def detect(self, engine: Engine) -> bool:
+        with engine.connect() as conn:
+            return self._fts_columns(conn) == self._columns
+
+    def setup(self, engine: Engine) -> None:
+        with engine.begin() as conn:
+            cols = self._fts_columns(conn)
+            if cols and cols != self._columns:  # built by an older layout
+                conn.execute(text("DROP TABLE EventsFts"))
+            if cols != self._columns:
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE EventsFts USING fts5("
+                    "SearchKey, tokenize='unicode61 remove_diacritics 2')"
+                ))
+            # full resync: rows written outside the app since the last run
+            conn.execute(text("DELETE FROM EventsFts"))
+            conn.execute(text(
+                "INSERT INTO EventsFts(rowid, SearchKey) "
+                "SELECT Id, COALESCE(SearchKey,'') FROM Events"
+            ))
+
+    def index_event(self, db: Session, e: EventDB) -> None:
+        self.remove_event(db, e.Id)
+        db.execute(
+            text("INSERT INTO EventsFts(rowid, SearchKey) VALUES (:id, :key)"),
+            {"id": e.Id, "key": e.SearchKey or ""},
+        )
+
+    def remove_event(self, db: Session, event_id: int) -> None:
+        db.execute(text("DELETE FROM EventsFts WHERE rowid = :id"), {"id": event_id})
+
+
+class MssqlFullTextBackend(_MatchBackend):
+    name = "mssql"
+    _match_sql = (
+        "SELECT [KEY] AS event_id, RANK AS rank "
+        "FROM CONTAINSTABLE(Events, SearchKey, :fts_q)"
+    )
+    _rank_desc = True
+
+    def _query_string(self, tokens: list[str]) -> str:
+        return " AND ".join(f'"{t}*"' for t in tokens)
+
+    def detect(self, engine: Engine) -> bool:
+        with engine.connect() as conn:
+            return conn.execute(text(
+                "SELECT 1 FROM sys.fulltext_index_columns "
+                "WHERE object_id = OBJECT_ID('Events') "
+                "AND column_id = COLUMNPROPERTY(OBJECT_ID('Events'), 'SearchKey', 'ColumnId')"
+            )).first() is not None
+
+    def setup(self, engine: Engine) -> None:
+        # CREATE FULLTEXT ... cannot run inside a user transaction
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            if not conn.execute(text("SELECT FULLTEXTSERVICEPROPERTY('IsFullTextInstalled')")).scalar():
+                raise RuntimeError("full-text search is not installed on this SQL Server")
+            if conn.execute(text(
+                "SELECT 1 FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('Events')"
+            )).first():
+                has_key = conn.execute(text(
+                    "SELECT 1 FROM sys.fulltext_index_columns "
+                    "WHERE object_id = OBJECT_ID('Events') "
+                    "AND column_id = COLUMNPROPERTY(OBJECT_ID('Events'), 'SearchKey', 'ColumnId')"
+                )).first()
+                if not has_key:
+                    conn.execute(text("ALTER FULLTEXT INDEX ON Events ADD (SearchKey)"))
+                return
+            pk = conn.execute(text(
+                "SELECT name FROM sys.indexes "
+                "WHERE object_id = OBJECT_ID('Events') AND is_primary_key = 1"
+            )).scalar()
+            if not conn.execute(text(
+                "SELECT 1 FROM sys.fulltext_catalogs WHERE name = 'ft_events'"
+            )).first():
+                conn.execute(text("CREATE FULLTEXT CATALOG ft_events"))
+            conn.execute(text(
+                f"CREATE FULLTEXT INDEX ON Events (SearchKey) "
+                f"KEY INDEX [{pk}] ON ft_events WITH CHANGE_TRACKING AUTO"
+            ))
+
+
+_BACKENDS = {
+    "like": LikeBackend,
+    "fts5": SqliteFtsBackend,
+    "mssql": MssqlFullTextBackend,
+}
+
+_backend: Optional[LikeBackend] = None
+_lock = threading.Lock()
+
+
+def _choose(eng: Engine) -> str:
+    wanted = (settings.FULLTEXT_BACKEND or "auto").strip().lower()
+    if wanted != "auto":
+        return wanted
+    return {"sqlite": "fts5", "mssql": "mssql"}.get(eng.dialect.name, "like")
+
+
+def setup(eng: Engine | None = None) -> str:
+    """Create the chosen backend's table/index (DDL, own connection). Called by migrate.upgrade()."""
+    global _backend
+    eng = eng or engine
+    name = _choose(eng)
+    try:
+        _BACKENDS.get(name, LikeBackend)().setup(eng)
+    except Exception as e:
+        logger.warning(f"full-text backend '{name}' setup failed, searches will use LIKE: {e}")
+        name = "like"
+    with _lock:
+        _backend = None  # re-detect on next use
+    return name
+
+
+def get_backend() -> LikeBackend:
+    global _backend
+    if _backend is not None:
+        return _backend
+    with _lock:
+        if _backend is None:
+            name = _choose(engine)
+            backend = _BACKENDS.get(name, LikeBackend)()
+            try:
+                found = backend.detect(engine)  # read-only; no DDL here
+            except Exception as e:
+                logger.warning(f"full-text backend '{name}' detection failed: {e}")
+                found = False
+            if not found:
+                logger.warning(
+                    f"full-text backend '{name}' is not set up, falling back to LIKE "
+                    f"(run python -m server.infra.migrate)"
+                )
+                backend = LikeBackend()
+            _backend = backend
+            _start_refresher()
+    return _backend
+
+
+def refresh_keys(eng: Engine | None = None, batch: int = 500, index: bool = True) -> int:
+    """
+    Compute SearchKey for rows where it is NULL (new rows / nulled by the
+    trigger) and re-index them in the full-text backend. Returns rows keyed.
+    """
+    eng = eng or engine
+    backend = get_backend() if index else LikeBackend()
+    done = 0
+    while True:
+        with Session(eng) as db:
+            rows = db.scalars(
+                select(EventDB)
+                .options(load_only(EventDB.Id, EventDB.City, EventDB.Title, EventDB.Venue,
+                                   EventDB.Category, EventDB.SearchKey))
+                .where(EventDB.SearchKey.is_(None))
+                .order_by(EventDB.Id)
+                .limit(batch)
+            ).all()
+            if not rows:
+                return done
+            for e in rows:
+                # "" (not NULL) for events with no text, so the loop terminates
+                e.SearchKey = build_search_key(e.City, e.Title, e.Venue, e.Category)
+            db.flush()
+            for e in rows:
+                backend.index_event(db, e)
+            db.commit()
+        done += len(rows)
+
+
+_refresher: Optional[threading.Thread] = None
+
+
+def _refresh_loop(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            if refresh_keys():
+                bump_events_generation()  # cached searches may now rank/match differently
+        except Exception:
+            logger.exception("SearchKey refresh failed; will retry")
+
+
+def _start_refresher() -> None:
+    global _refresher
+    interval = float(settings.SEARCH_KEY_REFRESH_SECONDS)
+    if interval <= 0 or _refresher is not None:
+        return
+    _refresher = threading.Thread(target=_refresh_loop, args=(interval,), name="search-keys", daemon=True)
+    _refresher.start()
+
+
+def apply(stmt: Any, q: str | None, rank: bool = False) -> Tuple[Any, Optional[Any]]:
+    """
+    Filter `stmt` (select(...) or Query over EventDB) by free text `q`.
+    Returns (stmt, rank_order) – rank_order is an ORDER BY clause when
+    `rank=True` and the backend can rank, else None.
+    """
+    nq = normalize_query(q)
+    if not nq:
+        return stmt, None
+    unkeyed = _unkeyed_match(q or "", nq)
+    if is_city(nq):
+        # SearchKey starts with the normalized city → index range scan, no full-text needed
+        return stmt.filter(or_(
+            EventDB.SearchKey == nq,
+            EventDB.SearchKey.startswith(nq + " ", autoescape=True),
+            unkeyed,
+        )), None
+    return get_backend().apply(stmt, nq, unkeyed, rank=rank)
+
+
+def index_event(db: Session, e: EventDB) -> None:
+    get_backend().index_event(db, e)
+
+
+def remove_event(db: Session, event_id: int) -> None:
+    get_backend().remove_event(db, event_id)
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# ================================================================
+#  EventHub Server — infra/idempotency.py
+# ================================================================
+"""
+📌 Purpose (Explanation Box)
+`Idempotency-Key` support for write endpoints (registrations, reactions,
+agent-requests), so clients and the gateway can retry a POST safely.
+
+How it works:
+- First request with a key reserves a row in IdempotencyKeys
+  (UserId, Scope, Key) – the unique constraint makes that atomic across
+  workers – runs the endpoint, then stores status + JSON body.
+- A retry with the same key and the same body gets the stored response
+  (header `Idempotent-Replayed: true`) from the in-process cache, or from
+  the DB row on another worker; business tables are not touched.
+- Same key, different body → 422. Same key while the first call is still
+  running → 409 (retry later). If the endpoint raises, the reservation is
+  dropped, so a retry runs again.
+- A reservation is a lease: if it is still unfinished after
+  IDEMPOTENCY_LEASE_SECONDS (the worker died mid-request), the next retry
+  takes it over (compare-and-swap on CreatedAt) and runs the request.
+
+Known window:
+- The endpoint commits its own transaction (the repos commit inside), and
+  the stored response is written right after in a second one. If the
+  process dies or the DB fails between the two, the retry sees an
+  unfinished reservation: 409 until the lease expires, then the request
+  runs again. Registrations then answer 409 "already registered" and
+  reactions return the existing row; an agent request could be created
+  twice.
+
+Notes:
+- Keys are scoped per user and per endpoint; rows older than
+  IDEMPOTENCY_TTL seconds are purged lazily.
+- Requests without the header are not affected at all.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from server.core.config import settings
+from server.infra.cache import get_cache
+from server.models.db_models import IdempotencyKeyDB
+
+KEY_MAX_LEN = 100  # IdempotencyKeys.Key
+
+_cache = get_cache("idempotency", maxsize=settings.IDEMPOTENCY_CACHE_SIZE, ttl=settings.IDEMPOTENCY_TTL)
+_last_purge = 0.0
+
+
+def _hash(payload: Any) -> str:
+    raw = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _replay(status_code: int, body: Optional[str]) -> Response:
+    headers = {"Idempotent-Replayed": "true"}
+    if body is None:
+        return Response(status_code=status_code, headers=headers)
+    return JSONResponse(status_code=status_code, content=json.loads(body), headers=headers)
+
+
+def _purge(db: Session) -> None:
+    global _last_purge
+    now = time.monotonic()
+    if now - _last_purge < 600:
+        return
+    _last_purge = now
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.IDEMPOTENCY_TTL)
+    db.execute(delete(IdempotencyKeyDB).where(IdempotencyKeyDB.CreatedAt < cutoff))
+    db.commit()
+
+
+def _begin(db: Session, user_id: int, scope: str, key: str, req_hash: str) -> Optional[Response]:
+    """Reserve the key, or return the stored response for a retry."""
+    ck = (user_id, scope, key)
+    hit = _cache.get(ck)
+    if hit is not None:
+        if hit[0] != req_hash:
+            raise HTTPException(status_code=422, detail="Idempotency-Key reused with a different request")
+        return _replay(hit[1], hit[2])
+
+    _purge(db)
+    db.add(IdempotencyKeyDB(UserId=user_id, Scope=scope, Key=key, RequestHash=req_hash))
+    try:
+        db.commit()
+        return None
+    except IntegrityError:
+        db.rollback()
+    row = db.execute(
+        select(
+            IdempotencyKeyDB.RequestHash, IdempotencyKeyDB.StatusCode,
+            IdempotencyKeyDB.Body, IdempotencyKeyDB.CreatedAt,
+        )
+        .where(IdempotencyKeyDB.UserId == user_id, IdempotencyKeyDB.Scope == scope, IdempotencyKeyDB.Key == key)
+    ).first()
+    if row is None:  # reservation was dropped in between → treat as busy, client retries
+        raise HTTPException(status_code=409, detail="request with this Idempotency-Key is in progress")
+    if row.RequestHash != req_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key reused with a different request")
+    if row.StatusCode is None:
+        if _take_over(db, user_id, scope, key, row.CreatedAt):
+            return None
+        raise HTTPException(status_code=409, detail="request with this Idempotency-Key is in progress")
+    _cache.set(ck, (row.RequestHash, row.StatusCode, row.Body))
+    return _replay(row.StatusCode, row.Body)
+
+
+def _where(user_id: int, scope: str, key: str):
+    return (
+        IdempotencyKeyDB.UserId == user_id,
+        IdempotencyKeyDB.Scope == scope,
+        IdempotencyKeyDB.Key == key,
+    )
+
+
+def _take_over(db: Session, user_id: int, scope: str, key: str, created_at: Optional[datetime]) -> bool:
+    """Claim an unfinished reservation whose lease expired; only one retry can win."""
+    now = datetime.utcnow()
+    if created_at is not None and now - created_at < timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS):
+        return False
+    stale = IdempotencyKeyDB.CreatedAt.is_(None) if created_at is None else IdempotencyKeyDB.CreatedAt == created_at
+    won = db.execute(
+        update(IdempotencyKeyDB)
+        .where(*_where(user_id, scope, key), IdempotencyKeyDB.StatusCode.is_(None), stale)
+        .values(CreatedAt=now)
+    ).rowcount == 1
+    db.commit()
+    return won
+
+
+def _complete(db: Session, user_id: int, scope: str, key: str, req_hash: str, status_code: int, body: Optional[str]) -> None:
+    db.execute(update(IdempotencyKeyDB).where(*_where(user_id, scope, key)).values(StatusCode=status_code, Body=body))
+    db.commit()
+    _cache.set((user_id, scope, key), (req_hash, status_code, body))
+
+
+def _abort(db: Session, user_id: int, scope: str, key: str) -> None:
+    db.rollback()
+    db.execute(delete(IdempotencyKeyDB).where(*_where(user_id, scope, key)))
+    db.commit()
+
+
+def _serialize(result: Any, status_code: int) -> Tuple[int, Optional[str]]:
+    if isinstance(result, Response):
+        body = bytes(result.body or b"")
+        return result.status_code, body.decode("utf-8") if body else None
+    if result is None:
+        return status_code, None
+    return status_code, json.dumps(jsonable_encoder(result))
+
+
+def idempotent(
+    db: Session,
+    key: Optional[str],
+    user_id: int,
+    scope: str,
+    payload: Any,
+    status_code: int,
+    fn: Callable[[], Any],
+) -> Any:
+    """
+    Run `fn()` at most once per (user, scope, key).
+    `status_code` is the route's success status (used when fn returns a model).
+    """
+    if not key:
+        return fn()
+    key = key.strip()
+    if not key or len(key) > KEY_MAX_LEN:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1..{KEY_MAX_LEN} characters")
+    req_hash = _hash(payload)
+    replay = _begin(db, int(user_id), scope, key, req_hash)
+    if replay is not None:
+        return replay
+    try:
+        result = fn()
+    except BaseException:
+        _abort(db, int(user_id), scope, key)
+        raise
+    code, body = _serialize(result, status_code)
+    _complete(db, int(user_id), scope, key, req_hash, code, body)
+    return result
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+# ================================================================
+#  EventHub Server — infra/migrate.py
+# ================================================================
+"""
+📌 Purpose (Explanation Box)
+Idempotent schema upgrades for databases that already exist.
+
+Why?
+- `Base.metadata.create_all` creates missing tables, but never touches
+  tables that are already there (the Somee SQL Server DB), so new indexes
+  declared in db_models.py would silently never reach production.
+
+What it does now (in this order):
+- Adds model columns that are missing in the DB (nullable / server-default only).
+- Installs trg_events_search_key: text edits made outside the API reset
+  Events.SearchKey to NULL so the app re-keys them (server/infra/fulltext.py).
+- Backfills derived columns (Events.SearchKey, Users.EmailNorm/UsernameNorm,
+  Events.confirmed_count/waitlist_count and like_count/save_count when they
+  are first added).
+- Creates every index declared on the models that is missing in the DB, and
+  drops indexes an earlier version created that the models replaced.
+- Sets up the full-text backend (FTS5 table / SQL Server full-text index).
+
+Run:
+    python -m server.infra.migrate
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import func, inspect, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+
+from server.infra import fulltext
+from server.infra.db import engine as default_engine
+from server.models.db_models import Base, EventDB, RegistrationDB, UserDB
+
+
+def ensure_columns(engine: Engine) -> list[str]:
+    insp = inspect(engine)
+    added: list[str] = []
+    for table in Base.metadata.sorted_tables:
+        if not insp.has_table(table.name):
+            continue
+        existing = {c["name"] for c in insp.get_columns(table.name)}
+        for col in table.columns:
+            if col.name in existing:
+                continue
+            ddl = CreateColumn(col).compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD {ddl}")
+            added.append(f"{table.name}.{col.name}")
+    return added
+
+
+def backfill_search_keys(engine: Engine, batch: int = 500) -> int:
+    # full-text indexing is skipped here: fulltext.setup() resyncs the index afterwards
+    return fulltext.refresh_keys(engine, batch=batch, index=False)
+
+
+_SEARCH_KEY_TRIGGER = {
+    "sqlite": (
+        "CREATE TRIGGER trg_events_search_key "
+        "AFTER UPDATE OF Title, City, Venue, Category ON Events "
+        "WHEN NEW.SearchKey IS OLD.SearchKey "
+        "BEGIN UPDATE Events SET SearchKey = NULL WHERE Id = NEW.Id; END"
+    ),
+    "mssql": (
+        "CREATE TRIGGER trg_events_search_key ON Events AFTER UPDATE AS "
+        "BEGIN "
+        "SET NOCOUNT ON; "
+        "IF (UPDATE(Title) OR UPDATE(City) OR UPDATE(Venue) OR UPDATE(Category)) AND NOT UPDATE(SearchKey) "
+        "UPDATE e SET SearchKey = NULL FROM Events e JOIN inserted i ON e.Id = i.Id; "
+        "END"
+    ),
+}
+_TRIGGER_EXISTS = {
+    "sqlite": "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_events_search_key'",
+    "mssql": "SELECT 1 FROM sys.triggers WHERE name = 'trg_events_search_key'",
+}
+
+
+def ensure_search_key_trigger(engine: Engine) -> bool:
+    """SearchKey can only be computed in Python; the DB just invalidates it on text edits."""
+    ddl = _SEARCH_KEY_TRIGGER.get(engine.dialect.name)
+    if not ddl:
+        return False
+    with engine.begin() as conn:
+        if conn.exec_driver_sql(_TRIGGER_EXISTS[engine.dialect.name]).first():
+            return False
+        conn.exec_driver_sql(ddl)
+    return True
+
+
+def backfill_user_keys(engine: Engine) -> int:
+    # set-based: LOWER/LTRIM/RTRIM exist on both SQL Server and SQLite
+    with engine.begin() as conn:
+        return conn.execute(
+            update(UserDB)
+            .where((UserDB.EmailNorm.is_(None)) | (UserDB.UsernameNorm.is_(None)))
+            .values(
+                EmailNorm=func.lower(func.ltrim(func.rtrim(UserDB.Email))),
+                UsernameNorm=func.lower(func.ltrim(func.rtrim(UserDB.Username))),
+            )
+        ).rowcount or 0
+
+
+def recount_seats(engine: Engine) -> int:
+    """Recompute Events seat counters from Registrations (also usable as a repair tool)."""
+    def _sum(status: str):
+        return (
+            select(func.coalesce(func.sum(RegistrationDB.quantity), 0))
+            .where(RegistrationDB.EventId == EventDB.Id, RegistrationDB.status == status)
+            .scalar_subquery()
+        )
+    with engine.begin() as conn:
+        return conn.execute(
+            update(EventDB).values(confirmed_count=_sum("CONFIRMED"), waitlist_count=_sum("WAITLIST"))
+        ).rowcount or 0
+
+
+# table → index names replaced by a newer definition in db_models.py
+OBSOLETE_INDEXES = {
+    "Events": ("ix_events_status_starts_city",),  # → ix_events_starts_city_status
+    "Reactions": ("ix_react_user_type_event",),  # covered by uq_react_user_event_type
+}
+
+
+def drop_obsolete_indexes(engine: Engine) -> list[str]:
+    insp = inspect(engine)
+    dropped: list[str] = []
+    for table, names in OBSOLETE_INDEXES.items():
+        if not insp.has_table(table):
+            continue
+        existing = {ix["name"] for ix in insp.get_indexes(table) if ix.get("name")}
+        for name in names:
+            if name in existing:
+                ddl = f"DROP INDEX {name} ON {table}" if engine.dialect.name == "mssql" else f"DROP INDEX {name}"
+                with engine.begin() as conn:
+                    conn.exec_driver_sql(ddl)
+                dropped.append(name)
+    return dropped
+
+
+def ensure_indexes(engine: Engine) -> list[str]:
+    insp = inspect(engine)
+    created: list[str] = []
+    for table in Base.metadata.sorted_tables:
+        if not insp.has_table(table.name):
+            continue
+        existing = {ix["name"] for ix in insp.get_indexes(table.name) if ix.get("name")}
+        for ix in table.indexes:
+            if ix.name and ix.name not in existing:
+                ix.create(bind=engine)
+                created.append(ix.name)
+    return created
+
+
+def upgrade(engine: Engine | None = None) -> None:
+    engine = engine or default_engine
+    added = ensure_columns(engine)
+    for name in added:
+        print(f"✅ added column {name}")
+    if ensure_search_key_trigger(engine):
+        print("✅ created trigger trg_events_search_key")
+    n = backfill_search_keys(engine)
+    if n:
+        print(f"✅ backfilled SearchKey for {n} events")
+    n = backfill_user_keys(engine)
+    if n:
+        print(f"✅ backfilled EmailNorm/UsernameNorm for {n} users")
+    if "Events.confirmed_count" in added or "Events.waitlist_count" in added:
+        print(f"✅ recounted seats for {recount_seats(engine)} events")
+    if "Events.like_count" in added or "Events.save_count" in added:
+        from server.infra.counters import reconcile
+        print(f"✅ recounted reactions for {reconcile(engine)} events")
+    for name in drop_obsolete_indexes(engine):
+        print(f"✅ dropped index {name}")
+    for name in ensure_indexes(engine):
+        print(f"✅ created index {name}")
+    print(f"✅ full-text backend: {fulltext.setup(engine)}")
+
+
+if __name__ == "__main__":
+    upgrade()
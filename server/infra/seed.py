@@ -10,6 +10,7 @@ Minimal seed script to ensure DB tables exist.
 What it does now:
 - Imports SQLAlchemy Base from your models module.
 - Calls Base.metadata.create_all(engine) to create tables safely.
+- Runs server.infra.migrate.upgrade() to bring pre-existing tables up to date.
 
 Why minimal?
 - Until we verify model names and relations, we avoid inserting demo data.
@@ -22,6 +23,7 @@ Run:
 from __future__ import annotations
 
 from server.infra.db import engine
+from server.infra.migrate import upgrade
 
 # We try a few common locations for Base to keep this script flexible.
 Base = None
@@ -47,6 +49,8 @@ except Exception:
 def main() -> None:
     # Create all tables if they do not exist yet
     Base.metadata.create_all(bind=engine)
+    # Existing tables: add indexes/columns introduced after they were created
+    upgrade(engine)
     print("✅ DB schema ensured (create_all completed).")
 
 
@@ -27,6 +27,7 @@ from sqlalchemy import (
     Text,
     Index,
     UniqueConstraint,
+    text,
 )
 from sqlalchemy.orm import declarative_base, relationship
 
@@ -47,12 +48,25 @@ class UserDB(Base):
     role = Column(String(50), nullable=False, default="USER")  # USER/AGENT/ADMIN
     is_active = Column(Boolean, nullable=False, default=True)
     agent_status = Column(String(20), nullable=False, default="NONE")  # NONE/REQUESTED/APPROVED/REJECTED
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # bump = revoke JWTs
+
+    # trimmed + lower-cased Email/Username for index seeks (users_repo writes them, migrate backfills)
+    EmailNorm = Column(String(100))
+    UsernameNorm = Column(String(50))
 
     # Relationships
     events = relationship("EventDB", back_populates="creator", cascade="all,delete-orphan")
     registrations = relationship("RegistrationDB", back_populates="user", cascade="all,delete-orphan")
     reactions = relationship("ReactionsDB", back_populates="user", cascade="all,delete-orphan")
 
+    # filtered: rows not yet backfilled (NULL) must not collide on SQL Server
+    __table_args__ = (
+        Index("ux_users_email_norm", "EmailNorm", unique=True,
+              mssql_where=text("EmailNorm IS NOT NULL"), sqlite_where=text("EmailNorm IS NOT NULL")),
+        Index("ux_users_username_norm", "UsernameNorm", unique=True,
+              mssql_where=text("UsernameNorm IS NOT NULL"), sqlite_where=text("UsernameNorm IS NOT NULL")),
+    )
+
     def __repr__(self) -> str:
         return f"<UserDB Id={self.Id} Email={self.Email} Role={self.role}>"
 
@@ -78,9 +92,18 @@ class EventDB(Base):
     ends_at = Column(DateTime)
     status = Column(String(20), nullable=False, default="DRAFT")
     capacity = Column(Integer, nullable=False, default=0)
+    # seats held by CONFIRMED / WAITLIST registrations (sum of quantity), kept by RegistrationsRepo
+    confirmed_count = Column(Integer, nullable=False, default=0, server_default="0")
+    waitlist_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Reactions per type, flushed in batches by server/infra/counters.py
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")
+    save_count = Column(Integer, nullable=False, default=0, server_default="0")
     description = Column(Text)  # NVARCHAR(MAX) equivalent on MSSQL
     image_url = Column(String(300))
 
+    # Normalized "city title venue category" (server/core/search_keys.py), maintained by EventsRepo
+    SearchKey = Column(String(400))
+
     # Optional relation to creator
     CreatedBy = Column(Integer, ForeignKey("Users.Id", ondelete="SET NULL"), nullable=True)
     creator = relationship("UserDB", back_populates="events", primaryjoin="UserDB.Id==EventDB.CreatedBy")
@@ -94,6 +117,13 @@ class EventDB(Base):
         Index("ix_events_category", "Category"),
         Index("ix_events_city", "City"),
         Index("ix_events_starts_at", "starts_at"),
+        # keyset pagination: /events/search (CreatedAt DESC, Id DESC), repo search (starts_at, Id)
+        Index("ix_events_created_id", "CreatedAt", "Id"),
+        Index("ix_events_starts_id", "starts_at", "Id"),
+        Index("ix_events_search_key", "SearchKey"),
+        # /events/search date-range (+ city / status, checked inside the index);
+        # starts_at leads because clients rarely send status
+        Index("ix_events_starts_city_status", "starts_at", "City", "status"),
     )
 
     def __repr__(self) -> str:
@@ -110,6 +140,7 @@ class RegistrationDB(Base):
     UserId = Column(Integer, ForeignKey("Users.Id", ondelete="CASCADE"), nullable=False)
     EventId = Column(Integer, ForeignKey("Events.Id", ondelete="CASCADE"), nullable=False)
     status = Column(String(20), nullable=False, default="CONFIRMED")  # CONFIRMED/WAITLIST/CANCELLED
+    quantity = Column(Integer, nullable=False, default=1, server_default="1")
     CreatedAt = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("UserDB", back_populates="registrations")
@@ -118,6 +149,8 @@ class RegistrationDB(Base):
     # One registration per user per event
     __table_args__ = (
         UniqueConstraint("UserId", "EventId", name="uq_reg_user_event"),
+        # waitlist promotion: WHERE EventId = ? AND status = 'WAITLIST' ORDER BY CreatedAt
+        Index("ix_reg_event_status_created", "EventId", "status", "CreatedAt", "Id"),
     )
 
     def __repr__(self) -> str:
@@ -165,3 +198,27 @@ class ReactionsDB(Base):
 
     def __repr__(self) -> str:
         return f"<ReactionsDB Id={self.Id} UserId={self.UserId} EventId={self.EventId} Type={self.type}>"
+
+
+# -----------------------------
+# Idempotency keys (server/infra/idempotency.py)
+# -----------------------------
+class IdempotencyKeyDB(Base):
+    __tablename__ = "IdempotencyKeys"
+
+    Id = Column(Integer, primary_key=True, autoincrement=True)
+    UserId = Column(Integer, nullable=False)
+    Scope = Column(String(50), nullable=False)       # e.g. "POST /registrations"
+    Key = Column(String(100), nullable=False)        # client's Idempotency-Key header
+    RequestHash = Column(String(64), nullable=False)  # sha256 of the request body
+    StatusCode = Column(Integer)                      # NULL = still in progress
+    Body = Column(Text)                               # JSON response to replay
+    CreatedAt = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("UserId", "Scope", "Key", name="uq_idem_user_scope_key"),
+        Index("ix_idem_created", "CreatedAt"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<IdempotencyKeyDB UserId={self.UserId} Scope={self.Scope} Key={self.Key}>"
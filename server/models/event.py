@@ -97,13 +97,22 @@ class EventPublic(EventBase):
 
 
 # ---------------- Search ----------------
+# recent   → CreatedAt DESC, Id DESC
+# upcoming → starts_at ASC (NULL last), Id ASC
+# relevance→ full-text rank first (needs q), then the caller's default order
+EventSort = Literal["recent", "upcoming", "relevance"]
+
+
 class EventSearchParams(_BaseModel):
     q: Optional[str] = None
     category: Optional[str] = None
+    city: Optional[str] = None
     from_date: Optional[date] = None
     to_date: Optional[date] = None
     page: int = 1
     limit: int = 10
+    cursor: Optional[str] = None  # keyset cursor (next_cursor of previous page)
+    sort: EventSort = "upcoming"
 
 
 class EventSearchResult(_BaseModel):
@@ -111,6 +120,7 @@ class EventSearchResult(_BaseModel):
     page: int
     limit: int
     items: List[EventPublic]
+    next_cursor: Optional[str] = None
 
 
 # ---------------- Analytics (lightweight) ----------------
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Literal
+from typing import List, Literal
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -15,3 +15,8 @@ class ReactionPublic(BaseModel):
     event_id: int
     type: ReactionType
     created_at: datetime
+
+class ReactionState(BaseModel):
+    """Which of the requested events the current user liked / saved (absent = no)."""
+    liked: List[int] = Field(default_factory=list)
+    saved: List[int] = Field(default_factory=list)
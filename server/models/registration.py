@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Literal
+from typing import List, Literal, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -9,6 +9,9 @@ class RegistrationCreate(BaseModel):
     event_id: int
     quantity: int = Field(1, gt=0)
 
+class SeatsRelease(BaseModel):
+    seats: int = Field(..., gt=0)
+
 class RegistrationPublic(BaseModel):
     id: int
     user_id: int
@@ -24,3 +27,38 @@ class Registration(BaseModel):
     quantity: int = 1
     total_price: float | None = None
     created_at: datetime
+
+
+# ---------- bulk (POST /registrations/bulk) ----------
+class BulkRegistrationItem(BaseModel):
+    user_id: int
+    event_id: int
+    quantity: int = Field(1, gt=0)
+
+class BulkRegistrationRequest(BaseModel):
+    # either explicit rows, or one event for many users (or both)
+    items: List[BulkRegistrationItem] = []
+    event_id: Optional[int] = None
+    user_ids: List[int] = []
+    quantity: int = Field(1, gt=0)
+
+    def rows(self) -> List[BulkRegistrationItem]:
+        out = list(self.items)
+        if self.event_id is not None:
+            out += [BulkRegistrationItem(user_id=u, event_id=self.event_id, quantity=self.quantity) for u in self.user_ids]
+        return out
+
+class BulkRegistrationOutcome(BaseModel):
+    row: int
+    user_id: int
+    event_id: int
+    status: Literal["CONFIRMED", "WAITLIST", "ERROR"]
+    registration_id: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkRegistrationResult(BaseModel):
+    total: int
+    confirmed: int
+    waitlisted: int
+    errors: int
+    results: List[BulkRegistrationOutcome]
@@ -4,6 +4,7 @@ from datetime import datetime
 from sqlalchemy.orm import Session
 from server.models.db_models import AgentRequestDB, UserDB
 from server.models.agent_request import AgentRequestCreate, AgentRequestPublic
+from server.repositories.users_repo import invalidate_user
 
 class AgentRequestsRepo:
     def _to_public(self, r: AgentRequestDB) -> AgentRequestPublic:
@@ -37,6 +38,9 @@ class AgentRequestsRepo:
         r.DecidedByUserId = decider_id
         db.commit()
         db.refresh(r)
+        user = db.get(UserDB, r.UserId)
+        # role/agent status may change on decision
+        invalidate_user(user_id=r.UserId, email=user.Email if user else None)
         return self._to_public(r)
 
 repo_agent_requests = AgentRequestsRepo()
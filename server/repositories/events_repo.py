@@ -2,8 +2,13 @@ from __future__ import annotations
 from typing import Optional, List
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import case, or_
+from sqlalchemy import select
+from server.core.pagination import encode_cursor, decode_cursor, keyset_after, keyset_order
+from server.core.search_keys import build_search_key, canonical_city
+from server.infra import fulltext
+from server.infra.cache import bump_events_generation
 from server.models.db_models import EventDB
+from server.repositories.registrations_repo import repo_registrations
 from server.models.event import (
     EventPublic,
     EventCreate,
@@ -14,7 +19,51 @@ from server.models.event import (
 from server.models.user import UserInDB as User
 
 
+# EventSort → (keyset column, descending); Id is always the tie-breaker
+SORT_KEYS = {
+    "recent": (EventDB.CreatedAt, True),    # ix_events_created_id
+    "upcoming": (EventDB.starts_at, False),  # ix_events_starts_id
+}
+
+# listing projection: skips description (Text / NVARCHAR(MAX)) and Url
+_LIST_COLUMNS = (
+    EventDB.Id,
+    EventDB.Title,
+    EventDB.Category,
+    EventDB.Venue,
+    EventDB.City,
+    EventDB.Country,
+    EventDB.Price,
+    EventDB.image_url,
+    EventDB.capacity,
+    EventDB.starts_at,
+    EventDB.ends_at,
+    EventDB.status,
+    EventDB.CreatedBy,
+    EventDB.CreatedAt,
+)
+
+
 class EventsRepo:
+    def _row_to_public(self, r) -> EventPublic:
+        # r is a lightweight Row (named tuple) from a _LIST_COLUMNS select
+        return EventPublic(
+            id=r.Id,
+            title=r.Title,
+            category=r.Category,
+            venue=r.Venue,
+            city=r.City,
+            country=r.Country,
+            price=float(r.Price) if r.Price is not None else None,
+            image_url=r.image_url,
+            capacity=r.capacity,
+            starts_at=r.starts_at,
+            ends_at=r.ends_at,
+            status=r.status,
+            owner_id=r.CreatedBy,
+            created_at=r.CreatedAt,
+        )
+
     def _to_public(self, e: EventDB) -> EventPublic:
         return EventPublic(
             id=e.Id,
@@ -39,21 +88,20 @@ class EventsRepo:
         return self._to_public(obj) if obj else None
 
     def search(self, db: Session, params: EventSearchParams) -> EventSearchResult:
-        q = db.query(EventDB)
-
-        if params.q:
-            like = f"%{params.q}%"
-            q = q.filter(
-                or_(
-                    EventDB.Title.ilike(like),
-                    EventDB.Category.ilike(like),
-                    EventDB.City.ilike(like),
-                )
-            )
+        q, rank_order = fulltext.apply(
+            db.query(*_LIST_COLUMNS), params.q, rank=(params.sort == "relevance")
+        )
+        if rank_order is not None and params.cursor:
+            raise ValueError("cursor is not supported with sort=relevance")
+        # relevance ties fall back to the repo default ("upcoming")
+        key_col, desc = SORT_KEYS["upcoming" if params.sort == "relevance" else params.sort]
 
         if params.category:
             q = q.filter(EventDB.Category == params.category)
 
+        if params.city:
+            q = q.filter(EventDB.City == canonical_city(params.city))
+
         if params.from_date:
             q = q.filter(
                 EventDB.starts_at >= datetime(
@@ -70,26 +118,35 @@ class EventsRepo:
 
         total = q.count()
 
-        q = q.order_by(
-            case((EventDB.starts_at.is_(None), 1), else_=0).asc(),
-            EventDB.starts_at.asc(),
-            EventDB.Id.asc(),
-        )
+        after = decode_cursor(params.cursor, 2)  # raises InvalidCursorError (ValueError)
+        if after is not None:
+            q = q.filter(keyset_after(key_col, EventDB.Id, *after, descending=desc))
+
+        if rank_order is not None:
+            q = q.order_by(rank_order)
+        q = q.order_by(*keyset_order(key_col, EventDB.Id, desc))
 
         # פאגינציה תואמת MSSQL:
         # בעמוד ראשון לא לבצע offset(0) – זה יוצר TOP(...) במקום FETCH FIRST
-        offset = (params.page - 1) * params.limit
+        # עם cursor אין offset בכלל – seek על (עמודת המיון, Id), למשל ix_events_starts_id
+        offset = 0 if after is not None else (params.page - 1) * params.limit
         if offset > 0:
-            q = q.offset(offset).limit(params.limit)   # יפיק OFFSET ... FETCH NEXT ... ONLY
+            q = q.offset(offset).limit(params.limit + 1)   # יפיק OFFSET ... FETCH NEXT ... ONLY
         else:
-            q = q.limit(params.limit)                  # יפיק SELECT TOP (...) ...
+            q = q.limit(params.limit + 1)                  # יפיק SELECT TOP (...) ...
 
         items = q.all()
+        next_cursor = None
+        if len(items) > params.limit:
+            items = items[: params.limit]
+            if rank_order is None:
+                next_cursor = encode_cursor(getattr(items[-1], key_col.key), items[-1].Id)
         return EventSearchResult(
             total=total,
             page=params.page,
             limit=params.limit,
-            items=[self._to_public(e) for e in items],
+            items=[self._row_to_public(r) for r in items],
+            next_cursor=next_cursor,
         )
 
     def create(self, db: Session, owner_id: int, data: EventCreate) -> EventPublic:
@@ -108,8 +165,12 @@ class EventsRepo:
             status=data.status or "DRAFT",
             CreatedBy=owner_id,
         )
+        obj.SearchKey = build_search_key(obj.City, obj.Title, obj.Venue, obj.Category)
         db.add(obj)
+        db.flush()  # need obj.Id for the full-text row
+        fulltext.index_event(db, obj)
         db.commit()
+        bump_events_generation()
         db.refresh(obj)
         return self._to_public(obj)
 
@@ -146,7 +207,13 @@ class EventsRepo:
             elif field == "status":
                 obj.status = value
 
+        obj.SearchKey = build_search_key(obj.City, obj.Title, obj.Venue, obj.Category)
+        fulltext.index_event(db, obj)
+        if "capacity" in data.model_fields_set:
+            db.flush()  # locks the row; waitlisters move into new seats in this transaction
+            repo_registrations.promote_waitlist(db, obj.Id)
         db.commit()
+        bump_events_generation()
         db.refresh(obj)
         return self._to_public(obj)
 
@@ -160,6 +227,7 @@ class EventsRepo:
             raise ValueError("event not found")
         obj.status = status
         db.commit()
+        bump_events_generation()
         db.refresh(obj)
         return self._to_public(obj)
 
@@ -167,17 +235,19 @@ class EventsRepo:
         obj = db.get(EventDB, event_id)
         if not obj:
             return
+        fulltext.remove_event(db, event_id)
         db.delete(obj)
         db.commit()
+        bump_events_generation()
 
     def list_for_owner(
         self, db: Session, owner_id: int, requester: User
     ) -> List[EventPublic]:
-        q = db.query(EventDB)
+        stmt = select(*_LIST_COLUMNS)
         if requester.role == "AGENT":
-            q = q.filter(EventDB.CreatedBy == owner_id)
-        items = q.order_by(EventDB.CreatedAt.desc()).all()
-        return [self._to_public(e) for e in items]
+            stmt = stmt.where(EventDB.CreatedBy == owner_id)
+        rows = db.execute(stmt.order_by(EventDB.CreatedAt.desc())).all()
+        return [self._row_to_public(r) for r in rows]
 
     def analytics_summary(self, db: Session):
         row = db.execute("SELECT * FROM v_analytics_totals").fetchone()
@@ -1,8 +1,15 @@
 from __future__ import annotations
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from server.infra.counters import reaction_counters
 from server.models.db_models import ReactionsDB  
-from server.models.reaction import ReactionCreate, ReactionPublic
+from server.models.reaction import ReactionCreate, ReactionPublic, ReactionState
+
+_COLUMNS = (ReactionsDB.Id, ReactionsDB.UserId, ReactionsDB.EventId, ReactionsDB.type, ReactionsDB.CreatedAt)
 
 class ReactionsRepo:
     def _to_public(self, r: ReactionsDB) -> ReactionPublic:
@@ -14,21 +21,58 @@ class ReactionsRepo:
             created_at=r.CreatedAt,
         )
 
+    def _upsert(self, db: Session, user_id: int, event_id: int, type: str) -> Tuple[Any, bool]:
+        """
+        One statement per like: returns (row, created). Double-clicks race on
+        uq_react_user_event_type inside the DB instead of SELECT-then-INSERT.
+        """
+        now = datetime.utcnow()
+        dialect = db.get_bind().dialect.name
+        if dialect == "mssql":
+            # HOLDLOCK: no gap between the match and the insert; the no-op UPDATE makes OUTPUT return the existing row
+            row = db.execute(text(
+                "MERGE Reactions WITH (HOLDLOCK) AS t "
+                "USING (SELECT :uid AS UserId, :eid AS EventId, :type AS type) AS s "
+                "ON t.UserId = s.UserId AND t.EventId = s.EventId AND t.type = s.type "
+                "WHEN MATCHED THEN UPDATE SET t.type = t.type "
+                "WHEN NOT MATCHED THEN INSERT (UserId, EventId, type, CreatedAt) "
+                "VALUES (s.UserId, s.EventId, s.type, :now) "
+                "OUTPUT inserted.Id, inserted.UserId, inserted.EventId, inserted.type, inserted.CreatedAt, $action;"
+            ), {"uid": user_id, "eid": event_id, "type": type, "now": now}).one()
+            return row, row[5] == "INSERT"
+        if dialect == "sqlite":
+            row = db.execute(
+                sqlite_insert(ReactionsDB)
+                .values(UserId=user_id, EventId=event_id, type=type, CreatedAt=now)
+                .on_conflict_do_nothing(index_elements=["UserId", "EventId", "type"])
+                .returning(*_COLUMNS)
+            ).first()
+            if row is not None:
+                return row, True
+        else:
+            try:
+                with db.begin_nested():
+                    db.add(ReactionsDB(UserId=user_id, EventId=event_id, type=type, CreatedAt=now))
+            except IntegrityError:
+                pass
+            else:
+                return self._by_key(db, user_id, event_id, type), True
+        # already there (rare: the duplicate path only)
+        return self._by_key(db, user_id, event_id, type), False
+
+    def _by_key(self, db: Session, user_id: int, event_id: int, type: str):
+        return db.execute(
+            select(*_COLUMNS).where(
+                ReactionsDB.UserId == user_id, ReactionsDB.EventId == event_id, ReactionsDB.type == type
+            )
+        ).one()
+
     def add(self, db: Session, user_id: int, data: ReactionCreate) -> ReactionPublic:
-        exists = (db.query(ReactionsDB)
-                    .filter(ReactionsDB.UserId == user_id,
-                            ReactionsDB.EventId == data.event_id,
-                            ReactionsDB.type == data.type)
-                    .first())
-        if exists:
-            return self._to_public(exists)
-
-        obj = ReactionsDB(UserId=user_id, EventId=data.event_id, type=data.type)
-        db.add(obj)
+        row, created = self._upsert(db, user_id, data.event_id, data.type)
         db.commit()
-        db.refresh(obj)
-        return self._to_public(obj)
-
+        if created:
+            reaction_counters.add(data.event_id, data.type, +1)
+        return self._to_public(row)
 
     def get(self, db: Session, reaction_id: int) -> Optional[ReactionPublic]:
         r = db.get(ReactionsDB, reaction_id)
@@ -38,8 +82,22 @@ class ReactionsRepo:
         r = db.get(ReactionsDB, reaction_id)
         if not r:
             return
+        event_id, type_ = r.EventId, r.type
         db.delete(r)
         db.commit()
+        reaction_counters.add(event_id, type_, -1)
+
+    def delete_by_key(self, db: Session, user_id: int, event_id: int, type: str) -> bool:
+        """Single DELETE by (user, event, type); False when there was nothing to remove."""
+        n = db.execute(
+            delete(ReactionsDB).where(
+                ReactionsDB.UserId == user_id, ReactionsDB.EventId == event_id, ReactionsDB.type == type
+            )
+        ).rowcount
+        db.commit()
+        if n:
+            reaction_counters.add(event_id, type, -n)
+        return bool(n)
 
     def list_for_event(self, db: Session, event_id: int) -> List[ReactionPublic]:
         rows = (db.query(ReactionsDB)
@@ -55,4 +113,19 @@ class ReactionsRepo:
         rows = q.order_by(ReactionsDB.CreatedAt.desc()).all()
         return [self._to_public(r) for r in rows]
 
+    def state_for_user(self, db: Session, user_id: int, event_ids: List[int]) -> ReactionState:
+        # one query, (EventId, type) pairs only – covered by uq_react_user_event_type (UserId, EventId, type)
+        state = ReactionState()
+        if not event_ids:
+            return state
+        rows = db.execute(
+            select(ReactionsDB.EventId, ReactionsDB.type)
+            .where(ReactionsDB.UserId == user_id, ReactionsDB.EventId.in_(event_ids))
+        ).all()
+        for eid, type_ in rows:
+            (state.liked if type_ == "LIKE" else state.saved).append(eid)
+        state.liked.sort()
+        state.saved.sort()
+        return state
+
 repo_reactions = ReactionsRepo()
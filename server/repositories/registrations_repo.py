@@ -1,11 +1,28 @@
 from __future__ import annotations
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple, Union
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from server.models.db_models import RegistrationDB, EventDB
-from server.models.registration import RegistrationCreate, RegistrationPublic, RegistrationStatus
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+from server.models.db_models import RegistrationDB, EventDB, UserDB
+from server.models.registration import (
+    RegistrationCreate,
+    RegistrationPublic,
+    BulkRegistrationItem,
+    BulkRegistrationOutcome,
+)
 from server.models.user import UserInDB as User
 
+CONFIRMED, WAITLIST, CANCELLED = "CONFIRMED", "WAITLIST", "CANCELLED"
+
+class AlreadyRegisteredError(Exception):
+    pass
+
+class SeatsExceedCapacityError(Exception):
+    """quantity > event capacity – could never be confirmed, so it is not waitlisted either."""
+
+# status -> Events counter column it occupies
+_COUNTER = {CONFIRMED: "confirmed_count", WAITLIST: "waitlist_count"}
+
 class RegistrationsRepo:
     def _to_public(self, r: RegistrationDB) -> RegistrationPublic:
         return RegistrationPublic(
@@ -16,55 +33,285 @@ class RegistrationsRepo:
             created_at=r.CreatedAt,
         )
 
-    def _current_confirmed_count(self, db: Session, event_id: int) -> int:
-        return db.query(func.count(RegistrationDB.Id)).filter(
-            RegistrationDB.EventId == event_id,
-            RegistrationDB.status == RegistrationStatus.CONFIRMED
-        ).scalar() or 0
+    def _claim_seats(self, db: Session, event_id: int, qty: int) -> str:
+        """
+        Reserve `qty` seats with one conditional UPDATE on the event row
+        (capacity 0 = unlimited). The row lock is held until the caller
+        commits, so concurrent signups can never oversell.
+        """
+        res = db.execute(
+            update(EventDB)
+            .where(
+                EventDB.Id == event_id,
+                or_(EventDB.capacity == 0, EventDB.confirmed_count + qty <= EventDB.capacity),
+            )
+            .values(confirmed_count=EventDB.confirmed_count + qty)
+        )
+        if res.rowcount == 1:
+            return CONFIRMED
+        res = db.execute(
+            update(EventDB)
+            .where(EventDB.Id == event_id, EventDB.capacity >= qty)
+            .values(waitlist_count=EventDB.waitlist_count + qty)
+        )
+        if res.rowcount == 0:
+            capacity = db.scalar(select(EventDB.capacity).where(EventDB.Id == event_id))
+            if capacity is None:
+                raise ValueError("event not found")
+            raise SeatsExceedCapacityError(f"quantity {qty} exceeds event capacity {capacity}")
+        return WAITLIST
+
+    def _lock_event(self, db: Session, event_id: int) -> bool:
+        # no-op UPDATE = row lock on every dialect (no FOR UPDATE on SQL Server)
+        return db.execute(
+            update(EventDB).where(EventDB.Id == event_id)
+            .values(confirmed_count=EventDB.confirmed_count)
+        ).rowcount == 1
+
+    def _release(self, db: Session, reg_id: int, event_id: int) -> bool:
+        """
+        Move one registration to CANCELLED with a conditional UPDATE
+        (WHERE status = <status we read>) and give its seats back only if
+        this call made the transition – a concurrent cancel gets rowcount 0
+        and releases nothing. Caller holds the event row lock.
+        """
+        cur = db.execute(
+            select(RegistrationDB.status, RegistrationDB.quantity).where(RegistrationDB.Id == reg_id)
+        ).first()
+        if cur is None or cur.status == CANCELLED:
+            return False
+        res = db.execute(
+            update(RegistrationDB)
+            .where(RegistrationDB.Id == reg_id, RegistrationDB.status == cur.status)
+            .values(status=CANCELLED)
+            .execution_options(synchronize_session=False)
+        )
+        if res.rowcount != 1:
+            return False
+        col = _COUNTER.get(cur.status)
+        if col:
+            db.execute(
+                update(EventDB)
+                .where(EventDB.Id == event_id)
+                .values({col: getattr(EventDB, col) - (cur.quantity or 1)})
+            )
+        return True
 
     def create(self, db: Session, user_id: int, data: RegistrationCreate) -> RegistrationPublic:
-        ev = db.get(EventDB, data.event_id)
-        if not ev:
-            raise ValueError("event not found")
+        qty = int(data.quantity)
+        try:
+            status = self._claim_seats(db, data.event_id, qty)
+            obj = RegistrationDB(UserId=user_id, EventId=data.event_id, status=status, quantity=qty)
+            db.add(obj)
+            db.flush()  # INSERT in the same transaction as the counter UPDATE
+            out = self._to_public(obj)
+            db.commit()
+        except (ValueError, SeatsExceedCapacityError):
+            db.rollback()
+            raise
+        except IntegrityError as e:
+            db.rollback()  # also gives the seats back
+            raise AlreadyRegisteredError("already registered for this event") from e
+        return out
 
-        confirmed = self._current_confirmed_count(db, data.event_id)
-        status = RegistrationStatus.CONFIRMED
-        if ev.capacity and confirmed >= ev.capacity:
-            status = RegistrationStatus.WAITLIST
+    def create_batch(
+        self, db: Session, event_id: int, items: Sequence[Tuple[int, int]]
+    ) -> List[Union[RegistrationPublic, Exception]]:
+        """
+        Many (user_id, quantity) registrations for one event in ONE transaction
+        (admission queue, server/infra/admission.py): lock the event row once,
+        hand out seats in order, bulk insert, set the counters once.
+        Returns one RegistrationPublic or exception per item, in order.
+        """
+        if not self._lock_event(db, event_id):
+            db.rollback()
+            return [ValueError("event not found") for _ in items]
+        capacity, confirmed = db.execute(
+            select(EventDB.capacity, EventDB.confirmed_count).where(EventDB.Id == event_id)
+        ).one()
+        taken = set(db.scalars(
+            select(RegistrationDB.UserId).where(
+                RegistrationDB.EventId == event_id,
+                RegistrationDB.UserId.in_({uid for uid, _ in items}),
+            )
+        ))
 
-        obj = RegistrationDB(UserId=user_id, EventId=data.event_id, status=status)
-        db.add(obj)
+        results: List[Union[RegistrationDB, Exception]] = []
+        waitlisted = 0
+        for user_id, qty in items:
+            if user_id in taken:
+                results.append(AlreadyRegisteredError("already registered for this event"))
+                continue
+            if capacity and qty > capacity:
+                results.append(SeatsExceedCapacityError(f"quantity {qty} exceeds event capacity {capacity}"))
+                continue
+            taken.add(user_id)
+            if not capacity or confirmed + qty <= capacity:
+                status = CONFIRMED
+                confirmed += qty
+            else:
+                status = WAITLIST
+                waitlisted += qty
+            results.append(RegistrationDB(UserId=user_id, EventId=event_id, status=status, quantity=qty))
+
+        db.add_all(r for r in results if isinstance(r, RegistrationDB))
+        db.execute(
+            update(EventDB).where(EventDB.Id == event_id)
+            .values(confirmed_count=confirmed, waitlist_count=EventDB.waitlist_count + waitlisted)
+        )
+        try:
+            db.flush()
+        except IntegrityError:
+            # raced with a direct (non-queued) registration → redo one by one
+            db.rollback()
+            return [self._create_one(db, uid, event_id, qty) for uid, qty in items]
+        out = [self._to_public(r) if isinstance(r, RegistrationDB) else r for r in results]
         db.commit()
-        db.refresh(obj)
-        return self._to_public(obj)
+        return out
+
+    def create_bulk(
+        self, db: Session, rows: Sequence[BulkRegistrationItem], chunk: int = 500
+    ) -> List[BulkRegistrationOutcome]:
+        """
+        Group registrations (agents: school groups / corporate blocks).
+        Rows are grouped per event (input order kept inside each event) and
+        written by create_batch in chunks – one lock, one capacity check and one
+        commit per chunk. Unknown users are reported per row, never inserted.
+        """
+        by_event: dict[int, List[int]] = {}
+        for i, row in enumerate(rows):
+            by_event.setdefault(row.event_id, []).append(i)
+
+        out: List[Optional[BulkRegistrationOutcome]] = [None] * len(rows)
+        for event_id, idxs in by_event.items():
+            for start in range(0, len(idxs), max(int(chunk), 1)):
+                part = idxs[start:start + chunk]
+                known = set(db.scalars(
+                    select(UserDB.Id).where(UserDB.Id.in_({rows[i].user_id for i in part}))
+                ))
+                todo = [i for i in part if rows[i].user_id in known]
+                for i in part:
+                    if rows[i].user_id not in known:
+                        out[i] = self._outcome(i, rows[i], ValueError("user not found"))
+                results = self.create_batch(db, event_id, [(rows[i].user_id, rows[i].quantity) for i in todo])
+                for i, r in zip(todo, results):
+                    out[i] = self._outcome(i, rows[i], r)
+        return out  # type: ignore[return-value]
+
+    def _outcome(self, i: int, row: BulkRegistrationItem, r) -> BulkRegistrationOutcome:
+        if isinstance(r, Exception):
+            return BulkRegistrationOutcome(row=i, user_id=row.user_id, event_id=row.event_id, status="ERROR", error=str(r))
+        return BulkRegistrationOutcome(
+            row=i, user_id=row.user_id, event_id=row.event_id, status=r.status, registration_id=r.id,
+        )
+
+    def _create_one(self, db: Session, user_id: int, event_id: int, qty: int) -> Union[RegistrationPublic, Exception]:
+        try:
+            return self.create(db, user_id, RegistrationCreate(event_id=event_id, quantity=qty))
+        except (ValueError, AlreadyRegisteredError, SeatsExceedCapacityError) as e:
+            return e
 
     def get(self, db: Session, reg_id: int) -> Optional[RegistrationPublic]:
         r = db.get(RegistrationDB, reg_id)
         return self._to_public(r) if r else None
 
-    def cancel(self, db: Session, reg_id: int) -> None:
-        r = db.get(RegistrationDB, reg_id)
-        if not r:
-            return
-        # cancel
-        r.status = RegistrationStatus.CANCELLED
+    def cancel(self, db: Session, reg_id: int) -> List[int]:
+        """
+        Cancel + promote in ONE transaction: give the seats back, move the
+        oldest waitlisters that now fit to CONFIRMED, commit once.
+        Returns the promoted registration ids; [] when the registration was
+        already cancelled (also by a concurrent call).
+        """
+        event_id = db.scalar(select(RegistrationDB.EventId).where(RegistrationDB.Id == reg_id))
+        if event_id is None:
+            return []
+        # event row first, registration second – same lock order as create/promote
+        self._lock_event(db, event_id)
+        if not self._release(db, reg_id, event_id):
+            db.rollback()
+            return []
+        promoted = self.promote_waitlist(db, event_id)
         db.commit()
+        return promoted
+
+    def release_seats(self, db: Session, event_id: int, seats: int) -> List[int]:
+        """Raise capacity by `seats` and promote waitlisters into them (one transaction)."""
+        res = db.execute(
+            update(EventDB)
+            .where(EventDB.Id == event_id, EventDB.capacity > 0)  # 0 = unlimited, nothing to release
+            .values(capacity=EventDB.capacity + int(seats))
+        )
+        if res.rowcount == 0:
+            db.rollback()
+            if db.get(EventDB, event_id) is None:
+                raise ValueError("event not found")
+            return []
+        promoted = self.promote_waitlist(db, event_id)
+        db.commit()
+        return promoted
+
+    def promote_waitlist(self, db: Session, event_id: int, page: int = 50) -> List[int]:
+        """
+        Promote waitlisters in CreatedAt order while their quantity fits the
+        free seats (strict FIFO: stop at the first one that does not fit).
+        A waitlister larger than the whole capacity (capacity was lowered
+        after it queued) can never fit, so it is skipped instead of blocking
+        everyone behind it; it stays WAITLIST until capacity grows again.
+        Walks ix_reg_event_status_created page by page; caller commits and
+        must already hold the event row lock (any UPDATE of the row).
+        """
+        capacity, confirmed = db.execute(
+            select(EventDB.capacity, EventDB.confirmed_count).where(EventDB.Id == event_id)
+        ).one()
+        free = None if not capacity else capacity - confirmed
+        promoted: List[int] = []
+        seats = 0
+        after = None
+        while free is None or free > 0:
+            stmt = (
+                select(RegistrationDB.Id, RegistrationDB.quantity, RegistrationDB.CreatedAt)
+                .where(RegistrationDB.EventId == event_id, RegistrationDB.status == WAITLIST)
+                .order_by(RegistrationDB.CreatedAt.asc(), RegistrationDB.Id.asc())
+                .limit(page)
+            )
+            if after is not None:
+                stmt = stmt.where(
+                    or_(
+                        RegistrationDB.CreatedAt > after[0],
+                        (RegistrationDB.CreatedAt == after[0]) & (RegistrationDB.Id > after[1]),
+                    )
+                )
+            rows = db.execute(stmt).all()
+            stop = False
+            for reg_id, qty, created in rows:
+                qty = qty or 1
+                if capacity and qty > capacity:
+                    continue
+                if free is not None and qty > free:
+                    stop = True
+                    break
+                promoted.append(reg_id)
+                seats += qty
+                if free is not None:
+                    free -= qty
+            if stop or len(rows) < page:
+                break
+            after = (rows[-1].CreatedAt, rows[-1].Id)
 
-        # promote next from waitlist if capacity allows
-        ev = db.get(EventDB, r.EventId)
-        if not ev or not ev.capacity:
-            return
-
-        confirmed = self._current_confirmed_count(db, r.EventId)
-        if confirmed < ev.capacity:
-            next_waiting = (db.query(RegistrationDB)
-                              .filter(RegistrationDB.EventId == r.EventId,
-                                      RegistrationDB.status == RegistrationStatus.WAITLIST)
-                              .order_by(RegistrationDB.CreatedAt.asc())
-                              .first())
-            if next_waiting:
-                next_waiting.status = RegistrationStatus.CONFIRMED
-                db.commit()
+        if promoted:
+            db.execute(
+                update(RegistrationDB)
+                .where(RegistrationDB.Id.in_(promoted))
+                .values(status=CONFIRMED)
+                .execution_options(synchronize_session=False)
+            )
+            db.execute(
+                update(EventDB).where(EventDB.Id == event_id).values(
+                    confirmed_count=EventDB.confirmed_count + seats,
+                    waitlist_count=EventDB.waitlist_count - seats,
+                )
+            )
+        return promoted
 
     def list_for_user(self, db: Session, user_id: int) -> List[RegistrationPublic]:
         rows = (db.query(RegistrationDB)